@@ -7,6 +7,42 @@ class Settings(BaseSettings):
 
     BOT_TOKEN: SecretStr
     ADMIN_IDS: List[int]
+
+    # Outbound rate limits (Telegram allows ~30 msg/s overall and ~1 msg/s per chat)
+    GLOBAL_RATE_LIMIT: float = 25.0
+    PER_CHAT_RATE_LIMIT: float = 1.0
+    PER_CHAT_BURST: int = 3
+    LOOKUP_RATE_LIMIT: float = 20.0  # getChatMember calls per second
+
+    # Broadcasts
+    BROADCAST_CONCURRENCY: int = 20  # Worker tasks per running job
+    BROADCAST_BATCH_SIZE: int = 100
+    BROADCAST_MAX_RETRIES: int = 3
+    BROADCAST_RETRY_BASE_DELAY: float = 2.0
+    BROADCAST_RETRY_MAX_DELAY: float = 60.0
+    BROADCAST_PROGRESS_INTERVAL: float = 5.0  # Seconds between progress panel edits
+    BROADCAST_SHUTDOWN_TIMEOUT: float = 10.0  # Seconds sends in flight get to finish on shutdown
+
+    # Channel membership cache
+    MEMBERSHIP_CACHE_SIZE: int = 10_000  # Users
+    MEMBERSHIP_POSITIVE_TTL: float = 300.0
+    MEMBERSHIP_NEGATIVE_TTL: float = 30.0
+    # Stored memberships older than this are asked from Telegram again: leave
+    # updates are dropped while the bot is down
+    MEMBERSHIP_ROW_TTL: float = 86400.0
+    ACTIVE_CHANNELS_TTL: float = 0.0  # 0 = until an admin edits channels
+
+    # db_user snapshot cache
+    USER_CACHE_SIZE: int = 10_000  # Users
+    USER_CACHE_TTL: float = 60.0
+    # Stale-while-revalidate subscription gate: how long past MEMBERSHIP_POSITIVE_TTL
+    # a confirmed subscriber is let through while being rechecked in the background
+    SUBSCRIPTION_STALE_SECONDS: float = 0.0  # 0 = off, always check before the handler
+
+    # Membership sweeper: rechecks active users a batch every 5 minutes in idle hours
+    MEMBERSHIP_SWEEP_BATCH: int = 200  # Users per run, 0 = off
+    MEMBERSHIP_SWEEP_START_HOUR: int = 2  # Local time
+    MEMBERSHIP_SWEEP_END_HOUR: int = 7  # Exclusive
     
     @property
     def database_url(self) -> str:
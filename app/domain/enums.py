@@ -12,6 +12,31 @@ class ReferralStatus(StrEnum):
     PENDING = auto()
     CONFIRMED = auto()
 
+
+class BroadcastKind(StrEnum):
+    COPY = auto()  # copy_message of a stored admin message
+    TEXT = auto()  # send_message with stored HTML text, e.g. webinar reminders
+    SUBSCRIPTION = auto()  # stored text, only to users missing a required channel
+    TEMPLATE = auto()  # stored HTML text with per-user placeholders
+
+
+class BroadcastStatus(StrEnum):
+    CREATING = auto()  # recipients still being written, never started
+    SCHEDULED = auto()  # waits for scheduled_at, then becomes PENDING
+    PENDING = auto()
+    RUNNING = auto()
+    PAUSED = auto()  # stopped by an admin, not resumed on restart
+    COMPLETED = auto()
+    CANCELLED = auto()
+
+
+class DeliveryStatus(StrEnum):
+    PENDING = auto()
+    SENT = auto()
+    BLOCKED = auto()
+    FAILED = auto()
+    SKIPPED = auto()  # nothing to send, e.g. already subscribed
+
 class Region(StrEnum):
     TOSHKENT_SHAHRI = "Toshkent shahri"
     TOSHKENT_VILOYATI = "Toshkent viloyati"
@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 class AbstractChannelChecker(ABC):
     @abstractmethod
     async def is_member(self, user_id: int, channel_id: str) -> bool:
         pass
+
+    @abstractmethod
+    async def refresh(self, user_id: int, channel_id: str) -> Optional[bool]:
+        pass
@@ -1,12 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
-from app.infrastructure.database.models import User, Channel, UserSurveyAnswer, UserStatus, ReferralStatus
+from datetime import date, datetime
+from typing import Optional, List, Dict, Tuple, Iterable, AsyncIterator
+from app.infrastructure.database.models import (
+    User, Channel, ChannelMembership, UserSurveyAnswer, UserStatus, ReferralStatus,
+    BroadcastJob, BroadcastStatus, DeliveryStatus
+)
+from app.infrastructure.cache.channels import ChannelSnapshot
+from app.infrastructure.cache.users import UserSnapshot
 
 class AbstractUserRepository(ABC):
     @abstractmethod
     async def get_user(self, telegram_id: int) -> Optional[User]:
         pass
 
+    @abstractmethod
+    async def get_user_snapshot(self, telegram_id: int) -> Optional[UserSnapshot]:
+        pass
+
     @abstractmethod
     async def get_user_by_phone(self, phone_number: str) -> Optional[User]:
         pass
@@ -27,6 +37,22 @@ class AbstractUserRepository(ABC):
     async def get_all_users(self) -> List[User]:
         pass
 
+    @abstractmethod
+    def iter_recipient_ids(self, batch_size: int = 1000, filters: Optional[dict] = None) -> AsyncIterator[List[int]]:
+        pass
+
+    @abstractmethod
+    async def count_recipients(self, filters: Optional[dict] = None) -> int:
+        pass
+
+    @abstractmethod
+    async def mark_unreachable(self, telegram_ids: Iterable[int], commit: bool = True) -> None:
+        pass
+
+    @abstractmethod
+    async def clear_unreachable(self, telegram_id: int) -> None:
+        pass
+
     @abstractmethod
     async def get_top_users_by_balance(self, limit: int) -> List[User]:
         pass
@@ -35,6 +61,14 @@ class AbstractUserRepository(ABC):
     async def get_user_rank(self, telegram_id: int) -> int:
         pass
 
+    @abstractmethod
+    async def get_users_by_ids(self, telegram_ids: Iterable[int]) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def get_balance_ranks(self) -> Dict[int, int]:
+        pass
+
     @abstractmethod
     async def update_profile(
         self, 
@@ -51,7 +85,7 @@ class AbstractUserRepository(ABC):
 
 class AbstractChannelRepository(ABC):
     @abstractmethod
-    async def get_all_active(self) -> List[Channel]:
+    async def get_all_active(self) -> List[ChannelSnapshot]:
         pass
     
     @abstractmethod
@@ -66,6 +100,45 @@ class AbstractChannelRepository(ABC):
     async def delete_channel(self, id: int) -> None:
         pass
 
+    @abstractmethod
+    async def get_by_chat(self, chat_id: int, username: Optional[str]) -> Optional[Channel]:
+        pass
+
+class AbstractChannelMembershipRepository(ABC):
+    @abstractmethod
+    async def get_memberships(
+        self, user_id: int, channel_ids: Iterable[str], max_age: Optional[float] = None
+    ) -> Dict[str, bool]:
+        pass
+
+    @abstractmethod
+    async def set_membership(self, channel_id: str, user_id: int, is_member: bool) -> None:
+        pass
+
+    @abstractmethod
+    async def get_users_memberships(self, user_ids: Iterable[int], channel_ids: Iterable[str]) -> Dict[Tuple[int, str], bool]:
+        pass
+
+    @abstractmethod
+    async def set_memberships(self, memberships: Iterable[Tuple[str, int, bool]]) -> None:
+        pass
+
+    @abstractmethod
+    async def delete_channel_memberships(self, channel_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def count_members(self) -> Dict[str, int]:
+        pass
+
+    @abstractmethod
+    async def record_churn(self, channel_id: str, joined: int = 0, left: int = 0) -> None:
+        pass
+
+    @abstractmethod
+    async def get_churn(self, since: date) -> Dict[str, Tuple[int, int]]:
+        pass
+
 class AbstractSurveyRepository(ABC):
     @abstractmethod
     async def save_answer(self, user_id: int, answer: str) -> UserSurveyAnswer:
@@ -83,3 +156,48 @@ class AbstractReferralRepository(ABC):
     @abstractmethod
     async def get_referral_count(self, user_id: int) -> int:
         pass
+
+    @abstractmethod
+    async def get_referral_counts(self, user_ids: Iterable[int]) -> Dict[int, int]:
+        pass
+
+class AbstractBroadcastRepository(ABC):
+    @abstractmethod
+    async def create_job(self, label: str, status: BroadcastStatus = BroadcastStatus.PENDING, **payload) -> BroadcastJob:
+        pass
+
+    @abstractmethod
+    async def get_job(self, job_id: int) -> Optional[BroadcastJob]:
+        pass
+
+    @abstractmethod
+    async def get_unfinished_jobs(self) -> List[BroadcastJob]:
+        pass
+
+    @abstractmethod
+    async def get_jobs_by_status(self, statuses: Iterable[BroadcastStatus]) -> List[BroadcastJob]:
+        pass
+
+    @abstractmethod
+    async def claim_due_jobs(self, now: datetime) -> List[BroadcastJob]:
+        pass
+
+    @abstractmethod
+    async def add_recipients(self, job_id: int, user_ids: Iterable[int]) -> int:
+        pass
+
+    @abstractmethod
+    async def get_pending_recipients(self, job_id: int, after_id: int, limit: int) -> List[Tuple[int, int]]:
+        pass
+
+    @abstractmethod
+    async def mark_recipients(self, recipient_ids: List[int], state: DeliveryStatus, commit: bool = True) -> None:
+        pass
+
+    @abstractmethod
+    async def add_counters(self, job_id: int, sent: int = 0, blocked: int = 0, failed: int = 0, skipped: int = 0, retried: int = 0, commit: bool = True) -> None:
+        pass
+
+    @abstractmethod
+    async def set_status(self, job_id: int, status: BroadcastStatus) -> None:
+        pass
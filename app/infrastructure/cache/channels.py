@@ -0,0 +1,68 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, Tuple
+
+from app.config.settings import settings
+
+
+@dataclass(frozen=True)
+class ChannelSnapshot:
+    """Read-only copy of an active Channel row, safe to share between updates and sessions"""
+    id: int
+    channel_id: str
+    name: str
+    link: str
+    is_active: bool = True
+
+
+class ActiveChannelsCache:
+    """
+    Snapshot of the active channels, loaded once and served from memory to
+    every gated update. The channels table only changes through the admin
+    panel, and those paths call invalidate(), so the next read reloads it.
+
+    `version` grows with every invalidation. `ttl` (0 = never) bounds how
+    long a process can serve a snapshot another process has since changed.
+    """
+
+    def __init__(self, ttl: float = 0.0):
+        self.ttl = ttl
+        self.version = 0
+        self.loads = 0
+        self._channels: Optional[Tuple[ChannelSnapshot, ...]] = None
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        if self._channels is None or self._loaded_version != self.version:
+            return False
+        return not self.ttl or time.monotonic() - self._loaded_at < self.ttl
+
+    async def get(self, load: Callable[[], Awaitable[Tuple[ChannelSnapshot, ...]]]) -> Tuple[ChannelSnapshot, ...]:
+        """The cached snapshot, `load` is only awaited when it is missing or stale"""
+        if self._fresh():
+            return self._channels
+        async with self._lock:
+            # Concurrent misses wait for the first load instead of repeating it
+            if not self._fresh():
+                version = self.version
+                channels = tuple(await load())
+                if version == self.version:
+                    self._channels = channels
+                    self._loaded_version = version
+                    self._loaded_at = time.monotonic()
+                    self.loads += 1
+                else:
+                    # Invalidated while loading: serve it to this caller only
+                    return channels
+            return self._channels
+
+    def invalidate(self):
+        self.version += 1
+        self._channels = None
+
+
+# Shared by every SQLAlchemyChannelRepository of the process
+active_channels_cache = ActiveChannelsCache(ttl=settings.ACTIVE_CHANNELS_TTL)
@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config.settings import settings
+
+
+class MembershipCache:
+    """
+    In-process cache of getChatMember results, keyed on (user_id, channel_id).
+
+    Entries are grouped per user and the users are kept in LRU order, so at
+    most `max_users` users are cached and dropping one user is O(1). A positive
+    result lives `positive_ttl` seconds, a negative one `negative_ttl`: a user
+    who just subscribed should not stay locked out for long.
+    """
+
+    def __init__(self, max_users: int, positive_ttl: float, negative_ttl: float):
+        self.max_users = max_users
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._users: "OrderedDict[int, Dict[str, Tuple[bool, float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, channel_id: str) -> Optional[bool]:
+        """The cached result, None when it is missing or expired"""
+        entry = self._users.get(user_id, {}).get(channel_id)
+        if entry is None or entry[1] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._users.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, user_id: int, channel_id: str, is_member: bool):
+        ttl = self.positive_ttl if is_member else self.negative_ttl
+        channels = self._users.get(user_id)
+        if channels is None:
+            channels = self._users[user_id] = {}
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        channels[channel_id] = (is_member, time.monotonic() + ttl)
+
+    def invalidate_user(self, user_id: int):
+        self._users.pop(user_id, None)
+
+    def invalidate_channel(self, channel_id: str):
+        for channels in self._users.values():
+            channels.pop(channel_id, None)
+
+    def clear(self):
+        self._users.clear()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# Shared by every TelegramChannelChecker of the process
+membership_cache = MembershipCache(
+    max_users=settings.MEMBERSHIP_CACHE_SIZE,
+    positive_ttl=settings.MEMBERSHIP_POSITIVE_TTL,
+    negative_ttl=settings.MEMBERSHIP_NEGATIVE_TTL
+)
@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config.settings import settings
+
+
+class SubscriptionGateCache:
+    """
+    When each user last passed the subscription gate with every channel joined,
+    for CheckStatusMiddleware's stale-while-revalidate mode. A confirmation is
+    forgotten `max_age` seconds after it was made, and at most `max_users`
+    users are kept, in LRU order.
+    """
+
+    def __init__(self, max_users: int, max_age: float):
+        self.max_users = max_users
+        self.max_age = max_age
+        self._confirmed: "OrderedDict[int, float]" = OrderedDict()
+        self.hits = 0
+        self.revalidations = 0
+        self.revoked = 0
+
+    def age(self, user_id: int) -> Optional[float]:
+        """Seconds since the user was confirmed, None when unknown or too old"""
+        confirmed_at = self._confirmed.get(user_id)
+        if confirmed_at is None:
+            return None
+        age = time.monotonic() - confirmed_at
+        if age >= self.max_age:
+            del self._confirmed[user_id]
+            return None
+        self._confirmed.move_to_end(user_id)
+        self.hits += 1
+        return age
+
+    def confirm(self, user_id: int):
+        self._confirmed[user_id] = time.monotonic()
+        self._confirmed.move_to_end(user_id)
+        if len(self._confirmed) > self.max_users:
+            self._confirmed.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self._confirmed.pop(user_id, None)
+
+    def clear(self):
+        self._confirmed.clear()
+
+    def __len__(self) -> int:
+        return len(self._confirmed)
+
+
+# A confirmation is fresh for MEMBERSHIP_POSITIVE_TTL, then stale (served, but
+# revalidated in the background) for SUBSCRIPTION_STALE_SECONDS more
+subscription_gate = SubscriptionGateCache(
+    max_users=settings.MEMBERSHIP_CACHE_SIZE,
+    max_age=settings.MEMBERSHIP_POSITIVE_TTL + settings.SUBSCRIPTION_STALE_SECONDS
+)
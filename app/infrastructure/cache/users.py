@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.config.settings import settings
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only copy of a User row's columns, what middlewares hand to handlers as `db_user`"""
+    id: int
+    telegram_id: int
+    username: Optional[str]
+    first_name: str
+    full_name: Optional[str]
+    phone_number: Optional[str]
+    phone_number_2: Optional[str]
+    region: Optional[str]
+    status: str
+    referrer_id: Optional[int]
+    balance: int
+    study_status: Optional[str]
+    age_range: Optional[str]
+    has_voucher: bool
+    unreachable_since: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(**{field.name: getattr(user, field.name) for field in fields(cls)})
+
+
+class UserCache:
+    """
+    In-process cache of UserSnapshots keyed on telegram_id, at most `max_users`
+    in LRU order, each valid for `ttl` seconds.
+
+    Writes through SQLAlchemyUserRepository update or drop the entry. `version`
+    grows with every invalidation, so a snapshot read from the database while
+    one happened is not stored over it.
+    """
+
+    def __init__(self, max_users: int, ttl: float):
+        self.max_users = max_users
+        self.ttl = ttl
+        self.version = 0
+        self._users: "OrderedDict[int, Tuple[UserSnapshot, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, telegram_id: int) -> Optional[UserSnapshot]:
+        entry = self._users.get(telegram_id)
+        if entry is None or entry[1] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._users.move_to_end(telegram_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, snapshot: UserSnapshot, version: Optional[int] = None):
+        """Stores a snapshot, unless `version` shows an invalidation happened since it was read"""
+        if version is not None and version != self.version:
+            return
+        self._users[snapshot.telegram_id] = (snapshot, time.monotonic() + self.ttl)
+        self._users.move_to_end(snapshot.telegram_id)
+        if len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def invalidate(self, *telegram_ids: int):
+        self.version += 1
+        for telegram_id in telegram_ids:
+            self._users.pop(telegram_id, None)
+
+    def clear(self):
+        self.version += 1
+        self._users.clear()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# Shared by every SQLAlchemyUserRepository of the process
+user_cache = UserCache(max_users=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
@@ -32,3 +33,36 @@ session_factory = async_sessionmaker(
 async def get_db_session() -> AsyncSession:
     async with session_factory() as session:
         yield session
+
+class LazySession:
+    """
+    Stands in for an AsyncSession that is only created when first used, so
+    updates whose handlers never query the database never build one.
+
+    Everything not defined here is forwarded to the real session. release()
+    ends the current transaction, handing the connection back to the pool
+    (and letting SQLite checkpoint the WAL) until the next query.
+    """
+
+    def __init__(self, factory: async_sessionmaker = session_factory):
+        self._factory = factory
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    async def release(self):
+        if self._session is not None and self._session.in_transaction():
+            # Nothing is pending at the release points, this only ends the read transaction
+            await self._session.commit()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
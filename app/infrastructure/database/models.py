@@ -1,11 +1,11 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
-from sqlalchemy import BigInteger, String, Boolean, ForeignKey, DateTime, Integer, func, Identity
+from sqlalchemy import BigInteger, String, Boolean, ForeignKey, Date, DateTime, Integer, func, Identity, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
 from app.infrastructure.database.db_helper import Base
-from app.domain.enums import UserStatus, ReferralStatus
+from app.domain.enums import UserStatus, ReferralStatus, BroadcastKind, BroadcastStatus, DeliveryStatus
 
 class TimestampMixin:
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
@@ -22,13 +22,14 @@ class User(Base, AsyncAttrs, TimestampMixin):
     full_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     phone_number: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Format: +998xxxxxxxxx
     phone_number_2: Mapped[Optional[str]] = mapped_column(String, nullable=True) # Secondary phone
-    region: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Stores value from Region enum
-    status: Mapped[UserStatus] = mapped_column(String, default=UserStatus.NEW)
+    region: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)  # Stores value from Region enum
+    status: Mapped[UserStatus] = mapped_column(String, default=UserStatus.NEW, index=True)
     referrer_id: Mapped[Optional[int]] = mapped_column(BigInteger, ForeignKey("users.telegram_id"), nullable=True)
-    balance: Mapped[int] = mapped_column(Integer, default=0)
+    balance: Mapped[int] = mapped_column(Integer, default=0, index=True)
     study_status: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     age_range: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     has_voucher: Mapped[bool] = mapped_column(Boolean, default=False)
+    unreachable_since: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)  # Blocked the bot / deleted account
 
     # Relationships
     referrals_made = relationship("Referral", back_populates="referrer", foreign_keys="Referral.referrer_id")
@@ -45,6 +46,31 @@ class Channel(Base, AsyncAttrs, TimestampMixin):
     link: Mapped[str] = mapped_column(String)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
+class ChannelMembership(Base, AsyncAttrs, TimestampMixin):
+    """Bot users' membership in required channels, kept current by chat_member updates"""
+    __tablename__ = "channel_memberships"
+    __table_args__ = (
+        UniqueConstraint("user_id", "channel_id"),
+        # Subscriber counts per channel
+        Index("ix_channel_memberships_channel_member", "channel_id", "is_member"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    channel_id: Mapped[str] = mapped_column(String)  # Channel.channel_id
+    user_id: Mapped[int] = mapped_column(BigInteger)
+    is_member: Mapped[bool] = mapped_column(Boolean)
+
+class ChannelChurn(Base, AsyncAttrs, TimestampMixin):
+    """Bot users joining and leaving a required channel, per day"""
+    __tablename__ = "channel_churn"
+    __table_args__ = (UniqueConstraint("channel_id", "day"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    channel_id: Mapped[str] = mapped_column(String)  # Channel.channel_id
+    day: Mapped[date] = mapped_column(Date)
+    joined_count: Mapped[int] = mapped_column(Integer, default=0)
+    left_count: Mapped[int] = mapped_column(Integer, default=0)
+
 class UserSurveyAnswer(Base, AsyncAttrs, TimestampMixin):
     __tablename__ = "user_survey_answers"
 
@@ -118,7 +144,7 @@ class WebinarCheckin(Base, AsyncAttrs, TimestampMixin):
     __tablename__ = "webinar_checkins"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.telegram_id"))
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.telegram_id"), index=True)
     checked_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     webinar_date: Mapped[datetime] = mapped_column(DateTime, default=func.now())
 
@@ -127,3 +153,45 @@ class SystemSettings(Base, AsyncAttrs, TimestampMixin):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     point_collection_end_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+class BroadcastJob(Base, AsyncAttrs, TimestampMixin):
+    __tablename__ = "broadcast_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    label: Mapped[str] = mapped_column(String)  # "manual", "suspicious", "sent_1h", ...
+    kind: Mapped[BroadcastKind] = mapped_column(String, default=BroadcastKind.COPY)
+    status: Mapped[BroadcastStatus] = mapped_column(String, default=BroadcastStatus.PENDING)
+    created_by: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)  # Admin to report to
+
+    # Payload: either a message to copy or a text to send
+    from_chat_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    message_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    text: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    parse_mode: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    sent_count: Mapped[int] = mapped_column(Integer, default=0)
+    blocked_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    skipped_count: Mapped[int] = mapped_column(Integer, default=0)
+    retry_count: Mapped[int] = mapped_column(Integer, default=0)  # Re-delivery attempts, not recipients
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    # Scheduled jobs: when to start, and how long to spread the sends over (0 sends at full speed)
+    scheduled_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+    spread_seconds: Mapped[int] = mapped_column(Integer, default=0)
+    # Past this the job is cancelled instead of started or resumed, e.g. a reminder after the event
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+class BroadcastRecipient(Base, AsyncAttrs):
+    __tablename__ = "broadcast_recipients"
+    __table_args__ = (
+        UniqueConstraint("job_id", "user_id"),
+        # Resume cursor: pending recipients of a job in id order
+        Index("ix_broadcast_recipients_job_state", "job_id", "state", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[int] = mapped_column(Integer, ForeignKey("broadcast_jobs.id", ondelete="CASCADE"))
+    user_id: Mapped[int] = mapped_column(BigInteger)  # No FK: restore_backup wipes users
+    state: Mapped[DeliveryStatus] = mapped_column(String, default=DeliveryStatus.PENDING)
@@ -1,5 +1,7 @@
-from typing import Optional, List
-from sqlalchemy import select, update, delete, func
+from datetime import date, datetime
+from typing import Optional, List, Dict, Tuple, Iterable, AsyncIterator
+from sqlalchemy import select, update, delete, func, insert, exists, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -7,11 +9,52 @@ from app.domain.repositories import (
     AbstractUserRepository, 
     AbstractChannelRepository, 
     AbstractSurveyRepository, 
-    AbstractReferralRepository
+    AbstractReferralRepository,
+    AbstractBroadcastRepository,
+    AbstractChannelMembershipRepository
 )
 from app.infrastructure.database.models import (
-    User, Channel, UserSurveyAnswer, Referral, PointHistory, UserStatus, ReferralStatus
+    User, Channel, ChannelMembership, ChannelChurn, UserSurveyAnswer, Referral, PointHistory, UserStatus, ReferralStatus, WebinarCheckin,
+    BroadcastJob, BroadcastRecipient, BroadcastStatus, DeliveryStatus
 )
+from app.infrastructure.cache.channels import ChannelSnapshot, active_channels_cache
+from app.infrastructure.cache.users import UserSnapshot, user_cache
+
+def _recipient_conditions(filters: dict) -> list:
+    """
+    Translates broadcast audience filters into WHERE conditions on User.
+
+    Column filters take a single value or a list of accepted values; all
+    filters are ANDed, so any segment is one query over the users table.
+    """
+    conditions = []
+    # Chats that blocked the bot only waste API calls, skip them unless asked
+    if not filters.get("include_unreachable"):
+        conditions.append(User.unreachable_since == None)
+    if filters.get("full_name_missing"):
+        conditions.append(User.full_name == None)
+    if filters.get("exclude_ids"):
+        conditions.append(User.telegram_id.notin_(filters["exclude_ids"]))
+
+    for column in (User.region, User.age_range, User.study_status, User.status):
+        value = filters.get(column.key)
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            conditions.append(column.in_(list(value)))
+        else:
+            conditions.append(column == value)
+
+    if filters.get("balance_min") is not None:
+        conditions.append(User.balance >= filters["balance_min"])
+    if filters.get("balance_max") is not None:
+        conditions.append(User.balance <= filters["balance_max"])
+    if filters.get("has_voucher") is not None:
+        conditions.append(User.has_voucher == filters["has_voucher"])
+    if filters.get("checked_in") is not None:
+        checked_in = exists().where(WebinarCheckin.user_id == User.telegram_id)
+        conditions.append(checked_in if filters["checked_in"] else ~checked_in)
+    return conditions
 
 class SQLAlchemyUserRepository(AbstractUserRepository):
     def __init__(self, session: AsyncSession):
@@ -22,6 +65,19 @@ class SQLAlchemyUserRepository(AbstractUserRepository):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_user_snapshot(self, telegram_id: int) -> Optional[UserSnapshot]:
+        """Read-only copy of the user, from the in-process cache while it is fresh"""
+        snapshot = user_cache.get(telegram_id)
+        if snapshot is not None:
+            return snapshot
+        version = user_cache.version
+        user = await self.get_user(telegram_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot.from_user(user)
+        user_cache.set(snapshot, version)
+        return snapshot
+
     async def get_user_by_phone(self, phone_number: str) -> Optional[User]:
         stmt = select(User).where(User.phone_number == phone_number)
         result = await self.session.execute(stmt)
@@ -38,13 +94,13 @@ class SQLAlchemyUserRepository(AbstractUserRepository):
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
-        return user
+        return self._written(user)
 
     async def update_status(self, telegram_id: int, status: UserStatus) -> User:
         stmt = update(User).where(User.telegram_id == telegram_id).values(status=status).returning(User)
         result = await self.session.execute(stmt)
         await self.session.commit()
-        return result.scalar_one()
+        return self._written(result.scalar_one())
 
     async def add_points(self, telegram_id: int, amount: int, reason: str) -> User:
         # Add history
@@ -55,13 +111,71 @@ class SQLAlchemyUserRepository(AbstractUserRepository):
         stmt = update(User).where(User.telegram_id == telegram_id).values(balance=User.balance + amount).returning(User)
         result = await self.session.execute(stmt)
         await self.session.commit()
-        return result.scalar_one()
+        return self._written(result.scalar_one())
+
+    @staticmethod
+    def _written(user: User) -> User:
+        """
+        Writes an updated row through to the snapshot cache. The invalidation
+        first keeps a cache fill already in flight from storing an older copy.
+        """
+        user_cache.invalidate(user.telegram_id)
+        user_cache.set(UserSnapshot.from_user(user))
+        return user
 
     async def get_all_users(self) -> List[User]:
         stmt = select(User)
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def iter_recipient_ids(
+        self, batch_size: int = 1000, filters: Optional[dict] = None, after_id: Optional[int] = None
+    ) -> AsyncIterator[List[int]]:
+        """
+        Yields telegram_ids in pages of `batch_size`, keyset-paginated on the
+        unique telegram_id index, so mass sends never hold the whole table.
+        `after_id` resumes a walk that stopped at that id.
+        """
+        conditions = _recipient_conditions(filters or {})
+        last_id = after_id
+        while True:
+            stmt = select(User.telegram_id).where(*conditions).order_by(User.telegram_id).limit(batch_size)
+            if last_id is not None:
+                stmt = stmt.where(User.telegram_id > last_id)
+            result = await self.session.execute(stmt)
+            ids = list(result.scalars().all())
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+
+    async def count_recipients(self, filters: Optional[dict] = None) -> int:
+        stmt = select(func.count()).select_from(User).where(*_recipient_conditions(filters or {}))
+        return await self.session.scalar(stmt)
+
+    async def mark_unreachable(self, telegram_ids: Iterable[int], commit: bool = True) -> None:
+        ids = list(telegram_ids)
+        if not ids:
+            return
+        # Keep the first failure time of users that are already marked
+        stmt = update(User).where(
+            User.telegram_id.in_(ids),
+            User.unreachable_since == None
+        ).values(unreachable_since=datetime.now())
+        await self.session.execute(stmt)
+        if commit:
+            await self.session.commit()
+        user_cache.invalidate(*ids)
+
+    async def clear_unreachable(self, telegram_id: int) -> None:
+        stmt = update(User).where(
+            User.telegram_id == telegram_id,
+            User.unreachable_since != None
+        ).values(unreachable_since=None)
+        await self.session.execute(stmt)
+        await self.session.commit()
+        user_cache.invalidate(telegram_id)
+
     async def get_top_users_by_balance(self, limit: int) -> List[User]:
         stmt = select(User).order_by(User.balance.desc()).limit(limit)
         result = await self.session.execute(stmt)
@@ -81,6 +195,22 @@ class SQLAlchemyUserRepository(AbstractUserRepository):
         count_submission = await self.session.scalar(stmt)
         return count_submission + 1
 
+    async def get_users_by_ids(self, telegram_ids: Iterable[int]) -> List[User]:
+        stmt = select(User).where(User.telegram_id.in_(list(telegram_ids)))
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_balance_ranks(self) -> Dict[int, int]:
+        """
+        Rank of every balance, as get_user_rank() computes it (users with more
+        balance + 1), in a single window-function pass over the distinct balances.
+        """
+        per_balance = select(User.balance, func.count().label("users")).group_by(User.balance).subquery()
+        higher = func.sum(per_balance.c.users).over(order_by=per_balance.c.balance.desc()) - per_balance.c.users
+        stmt = select(per_balance.c.balance, (higher + 1).label("rank"))
+        result = await self.session.execute(stmt)
+        return {row.balance: row.rank for row in result}
+
     async def update_profile(
         self, 
         telegram_id: int, 
@@ -111,16 +241,23 @@ class SQLAlchemyUserRepository(AbstractUserRepository):
         stmt = update(User).where(User.telegram_id == telegram_id).values(**values).returning(User)
         result = await self.session.execute(stmt)
         await self.session.commit()
-        return result.scalar_one()
+        return self._written(result.scalar_one())
 
 class SQLAlchemyChannelRepository(AbstractChannelRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all_active(self) -> List[Channel]:
+    async def get_all_active(self) -> List[ChannelSnapshot]:
+        """Served from the in-process snapshot, the table is read again only after an edit"""
+        return list(await active_channels_cache.get(self._load_active))
+
+    async def _load_active(self) -> List[ChannelSnapshot]:
         stmt = select(Channel).where(Channel.is_active == True)
         result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+        return [
+            ChannelSnapshot(id=ch.id, channel_id=ch.channel_id, name=ch.name, link=ch.link, is_active=ch.is_active)
+            for ch in result.scalars().all()
+        ]
 
     async def get_all(self) -> List[Channel]:
         stmt = select(Channel)
@@ -131,12 +268,116 @@ class SQLAlchemyChannelRepository(AbstractChannelRepository):
         channel = Channel(channel_id=channel_id, name=name, link=link)
         self.session.add(channel)
         await self.session.commit()
+        active_channels_cache.invalidate()
         return channel
 
     async def delete_channel(self, id: int) -> None:
         stmt = delete(Channel).where(Channel.id == id)
         await self.session.execute(stmt)
         await self.session.commit()
+        active_channels_cache.invalidate()
+
+    async def get_by_chat(self, chat_id: int, username: Optional[str]) -> Optional[Channel]:
+        """The channel of a Telegram chat, stored either by numeric id or by @username"""
+        conditions = [Channel.channel_id == str(chat_id)]
+        if username:
+            conditions.append(func.lower(Channel.channel_id) == f"@{username.lower()}")
+        stmt = select(Channel).where(or_(*conditions)).limit(1)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+class SQLAlchemyChannelMembershipRepository(AbstractChannelMembershipRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_memberships(
+        self, user_id: int, channel_ids: Iterable[str], max_age: Optional[float] = None
+    ) -> Dict[str, bool]:
+        """
+        Known membership of a user per channel, channels never seen are left out,
+        and so are rows not updated within `max_age` seconds when it is given
+        """
+        stmt = select(ChannelMembership.channel_id, ChannelMembership.is_member).where(
+            ChannelMembership.user_id == user_id,
+            ChannelMembership.channel_id.in_(list(channel_ids))
+        )
+        if max_age is not None:
+            # updated_at is set by SQLite's CURRENT_TIMESTAMP, UTC
+            stmt = stmt.where(ChannelMembership.updated_at >= func.datetime("now", f"-{int(max_age)} seconds"))
+        result = await self.session.execute(stmt)
+        return {channel_id: is_member for channel_id, is_member in result}
+
+    async def set_membership(self, channel_id: str, user_id: int, is_member: bool) -> None:
+        stmt = sqlite_insert(ChannelMembership).values(
+            channel_id=channel_id, user_id=user_id, is_member=is_member
+        ).on_conflict_do_update(
+            index_elements=["user_id", "channel_id"],
+            set_={"is_member": is_member, "updated_at": func.now()}
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def get_users_memberships(self, user_ids: Iterable[int], channel_ids: Iterable[str]) -> Dict[Tuple[int, str], bool]:
+        """get_memberships for many users in one query, keyed on (user_id, channel_id)"""
+        stmt = select(ChannelMembership.user_id, ChannelMembership.channel_id, ChannelMembership.is_member).where(
+            ChannelMembership.user_id.in_(list(user_ids)),
+            ChannelMembership.channel_id.in_(list(channel_ids))
+        )
+        result = await self.session.execute(stmt)
+        return {(user_id, channel_id): is_member for user_id, channel_id, is_member in result}
+
+    async def set_memberships(self, memberships: Iterable[Tuple[str, int, bool]]) -> None:
+        """set_membership for many (channel_id, user_id, is_member) rows in one transaction"""
+        rows = [
+            {"channel_id": channel_id, "user_id": user_id, "is_member": is_member}
+            for channel_id, user_id, is_member in memberships
+        ]
+        if not rows:
+            return
+        stmt = sqlite_insert(ChannelMembership)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "channel_id"],
+            set_={"is_member": stmt.excluded.is_member, "updated_at": func.now()}
+        )
+        await self.session.execute(stmt, rows)
+        await self.session.commit()
+
+    async def delete_channel_memberships(self, channel_id: str) -> None:
+        """Forgets a channel's members, for when it stops being required"""
+        await self.session.execute(delete(ChannelMembership).where(ChannelMembership.channel_id == channel_id))
+        await self.session.commit()
+
+    async def count_members(self) -> Dict[str, int]:
+        stmt = select(ChannelMembership.channel_id, func.count()).where(
+            ChannelMembership.is_member == True
+        ).group_by(ChannelMembership.channel_id)
+        result = await self.session.execute(stmt)
+        return {channel_id: count for channel_id, count in result}
+
+    async def record_churn(self, channel_id: str, joined: int = 0, left: int = 0) -> None:
+        """Adds to today's join and leave counters of a channel"""
+        if not joined and not left:
+            return
+        stmt = sqlite_insert(ChannelChurn).values(
+            channel_id=channel_id, day=date.today(), joined_count=joined, left_count=left
+        ).on_conflict_do_update(
+            index_elements=["channel_id", "day"],
+            set_={
+                "joined_count": ChannelChurn.joined_count + joined,
+                "left_count": ChannelChurn.left_count + left,
+                "updated_at": func.now()
+            }
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def get_churn(self, since: date) -> Dict[str, Tuple[int, int]]:
+        """(joined, left) per channel from `since` on"""
+        stmt = select(
+            ChannelChurn.channel_id, func.sum(ChannelChurn.joined_count), func.sum(ChannelChurn.left_count)
+        ).where(ChannelChurn.day >= since).group_by(ChannelChurn.channel_id)
+        result = await self.session.execute(stmt)
+        return {channel_id: (joined, left) for channel_id, joined, left in result}
 
 class SQLAlchemySurveyRepository(AbstractSurveyRepository):
     def __init__(self, session: AsyncSession):
@@ -172,3 +413,102 @@ class SQLAlchemyReferralRepository(AbstractReferralRepository):
         )
         result = await self.session.execute(stmt)
         return result.scalar()
+
+    async def get_referral_counts(self, user_ids: Iterable[int]) -> Dict[int, int]:
+        """Confirmed referrals per referrer, users without any are left out"""
+        stmt = select(Referral.referrer_id, func.count()).where(
+            Referral.referrer_id.in_(list(user_ids)),
+            Referral.status == ReferralStatus.CONFIRMED
+        ).group_by(Referral.referrer_id)
+        result = await self.session.execute(stmt)
+        return {referrer_id: count for referrer_id, count in result}
+
+class SQLAlchemyBroadcastRepository(AbstractBroadcastRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_job(self, label: str, status: BroadcastStatus = BroadcastStatus.PENDING, **payload) -> BroadcastJob:
+        job = BroadcastJob(label=label, status=status, **payload)
+        self.session.add(job)
+        await self.session.commit()
+        return job
+
+    async def get_job(self, job_id: int) -> Optional[BroadcastJob]:
+        return await self.session.get(BroadcastJob, job_id, populate_existing=True)
+
+    async def get_unfinished_jobs(self) -> List[BroadcastJob]:
+        return await self.get_jobs_by_status([BroadcastStatus.PENDING, BroadcastStatus.RUNNING])
+
+    async def get_jobs_by_status(self, statuses: Iterable[BroadcastStatus]) -> List[BroadcastJob]:
+        stmt = select(BroadcastJob).where(BroadcastJob.status.in_(list(statuses))).order_by(BroadcastJob.id)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def claim_due_jobs(self, now: datetime) -> List[BroadcastJob]:
+        """Moves scheduled jobs whose time has come to PENDING and returns them"""
+        stmt = select(BroadcastJob).where(
+            BroadcastJob.status == BroadcastStatus.SCHEDULED, BroadcastJob.scheduled_at <= now
+        ).order_by(BroadcastJob.scheduled_at)
+        result = await self.session.execute(stmt)
+        jobs = list(result.scalars().all())
+        if jobs:
+            await self.session.execute(
+                update(BroadcastJob)
+                .where(BroadcastJob.id.in_([job.id for job in jobs]), BroadcastJob.status == BroadcastStatus.SCHEDULED)
+                .values(status=BroadcastStatus.PENDING)
+            )
+            await self.session.commit()
+        return jobs
+
+    async def add_recipients(self, job_id: int, user_ids: Iterable[int]) -> int:
+        rows = [{"job_id": job_id, "user_id": uid, "state": DeliveryStatus.PENDING} for uid in user_ids]
+        if rows:
+            await self.session.execute(insert(BroadcastRecipient), rows)
+            await self.session.execute(
+                update(BroadcastJob).where(BroadcastJob.id == job_id).values(total=BroadcastJob.total + len(rows))
+            )
+        await self.session.commit()
+        return len(rows)
+
+    async def get_pending_recipients(self, job_id: int, after_id: int, limit: int) -> List[Tuple[int, int]]:
+        """Returns (recipient_id, user_id) pairs, keyset-paginated on recipient id"""
+        stmt = (
+            select(BroadcastRecipient.id, BroadcastRecipient.user_id)
+            .where(
+                BroadcastRecipient.job_id == job_id,
+                BroadcastRecipient.state == DeliveryStatus.PENDING,
+                BroadcastRecipient.id > after_id
+            )
+            .order_by(BroadcastRecipient.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return [(row.id, row.user_id) for row in result]
+
+    async def mark_recipients(self, recipient_ids: List[int], state: DeliveryStatus, commit: bool = True) -> None:
+        if not recipient_ids:
+            return
+        stmt = update(BroadcastRecipient).where(BroadcastRecipient.id.in_(recipient_ids)).values(state=state)
+        await self.session.execute(stmt)
+        if commit:
+            await self.session.commit()
+
+    async def add_counters(self, job_id: int, sent: int = 0, blocked: int = 0, failed: int = 0, skipped: int = 0, retried: int = 0, commit: bool = True) -> None:
+        stmt = update(BroadcastJob).where(BroadcastJob.id == job_id).values(
+            sent_count=BroadcastJob.sent_count + sent,
+            blocked_count=BroadcastJob.blocked_count + blocked,
+            failed_count=BroadcastJob.failed_count + failed,
+            skipped_count=BroadcastJob.skipped_count + skipped,
+            retry_count=BroadcastJob.retry_count + retried
+        )
+        await self.session.execute(stmt)
+        if commit:
+            await self.session.commit()
+
+    async def set_status(self, job_id: int, status: BroadcastStatus) -> None:
+        values = {"status": status}
+        if status in (BroadcastStatus.COMPLETED, BroadcastStatus.CANCELLED):
+            values["finished_at"] = datetime.now()
+        stmt = update(BroadcastJob).where(BroadcastJob.id == job_id).values(**values)
+        await self.session.execute(stmt)
+        await self.session.commit()
@@ -1,22 +1,45 @@
 import logging
+from typing import Optional
 from aiogram import Bot
 from aiogram.enums import ChatMemberStatus
 from app.domain.interfaces import AbstractChannelChecker
+from app.infrastructure.cache.membership import MembershipCache, membership_cache
 
 logger = logging.getLogger(__name__)
 
+# Statuses that count as subscribed to a channel
+MEMBER_STATUSES = (ChatMemberStatus.MEMBER, ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.CREATOR)
+
 class TelegramChannelChecker(AbstractChannelChecker):
-    def __init__(self, bot: Bot):
+    def __init__(self, bot: Bot, cache: Optional[MembershipCache] = membership_cache):
         self.bot = bot
+        self.cache = cache
 
     async def is_member(self, user_id: int, channel_id: str) -> bool:
+        if self.cache is not None:
+            cached = self.cache.get(user_id, channel_id)
+            if cached is not None:
+                return cached
+
+        is_member = await self._fetch(user_id, channel_id)
+        if is_member is None:
+            # Errors are not cached, the next check asks Telegram again
+            return False
+        if self.cache is not None:
+            self.cache.set(user_id, channel_id, is_member)
+        return is_member
+
+    async def refresh(self, user_id: int, channel_id: str) -> Optional[bool]:
+        """Asks Telegram past the cache and caches the answer, None when the lookup failed"""
+        is_member = await self._fetch(user_id, channel_id)
+        if is_member is not None and self.cache is not None:
+            self.cache.set(user_id, channel_id, is_member)
+        return is_member
+
+    async def _fetch(self, user_id: int, channel_id: str) -> Optional[bool]:
         try:
             member = await self.bot.get_chat_member(chat_id=channel_id, user_id=user_id)
-            is_member = member.status in [
-                ChatMemberStatus.MEMBER,
-                ChatMemberStatus.ADMINISTRATOR,
-                ChatMemberStatus.CREATOR
-            ]
+            is_member = member.status in MEMBER_STATUSES
             logger.info(f"Subscription check: user={user_id}, channel={channel_id}, status={member.status}, is_member={is_member}")
             return is_member
         except Exception as e:
@@ -24,4 +47,4 @@ class TelegramChannelChecker(AbstractChannelChecker):
                 logger.error(f"CRITICAL: Bot cannot find channel {channel_id}. Is the bot an admin there?")
             else:
                 logger.error(f"Error checking subscription: user={user_id}, channel={channel_id}, error={e}")
-            return False
+            return None
@@ -0,0 +1,172 @@
+import asyncio
+import time
+import logging
+from contextvars import ContextVar
+from typing import Dict, Union
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import (
+    TelegramMethod, Response,
+    SendMessage, CopyMessage, ForwardMessage, SendPhoto, SendDocument, SendVideo,
+    SendAnimation, SendAudio, SendVoice, SendVideoNote, SendMediaGroup, SendSticker,
+    SendContact, SendLocation, SendVenue, SendPoll, SendDice,
+    GetChatMember
+)
+
+logger = logging.getLogger(__name__)
+
+# Methods that deliver a message to a chat and count against Telegram's flood limits
+OUTBOUND_METHODS = (
+    SendMessage, CopyMessage, ForwardMessage, SendPhoto, SendDocument, SendVideo,
+    SendAnimation, SendAudio, SendVoice, SendVideoNote, SendMediaGroup, SendSticker,
+    SendContact, SendLocation, SendVenue, SendPoll, SendDice
+)
+
+# Lookups that mass jobs issue per user; they have their own budget, separate from messages
+LOOKUP_METHODS = (GetChatMember,)
+
+# Set by mass senders (broadcast jobs) for their whole task: their requests only
+# take the budget left over by replies to users
+bulk_traffic: ContextVar[bool] = ContextVar("bulk_traffic", default=False)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, at most `capacity` stored.
+
+    Interactive waiters are served in FIFO order. Bulk waiters line up behind
+    a lock of their own and only one of them at a time, once no interactive
+    waiter is left, competes for a token. However many bulk sends are queued,
+    an interactive one waits for at most a single bulk token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._bulk_lock = asyncio.Lock()
+        self._interactive_waiting = 0
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+    async def acquire(self, bulk: bool = False):
+        if bulk:
+            async with self._bulk_lock:
+                await self._interactive_idle.wait()
+                await self._take()
+            return
+
+        self._interactive_waiting += 1
+        self._interactive_idle.clear()
+        try:
+            await self._take()
+        finally:
+            self._interactive_waiting -= 1
+            if not self._interactive_waiting:
+                self._interactive_idle.set()
+
+    async def _take(self):
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Session middleware that keeps all outbound messages of the process under
+    Telegram's global and per-chat limits. Every sender (handlers, broadcasts,
+    scheduler) goes through the same bot session, so they share one budget.
+
+    Membership lookups (getChatMember) are throttled by a bucket of their own,
+    so a mass subscription check cannot starve message delivery or vice versa.
+
+    Requests made under `bulk_traffic` use the bulk lane of every bucket, so
+    replies produced by update handlers always go out ahead of a broadcast.
+
+    A 429 (TelegramRetryAfter) on any request pauses all outbound messages for
+    `retry_after` seconds instead of letting the other senders keep hitting
+    the API and collecting more 429s.
+    """
+
+    # Drop idle per-chat buckets once there are this many of them
+    MAX_CHAT_BUCKETS = 10_000
+
+    def __init__(self, global_rate: float, per_chat_rate: float, per_chat_burst: int, lookup_rate: float):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.lookup_bucket = TokenBucket(lookup_rate, lookup_rate)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self._chat_buckets: Dict[Union[int, str], TokenBucket] = {}
+        self._paused_until = 0.0
+
+    def _chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.MAX_CHAT_BUCKETS:
+                self._prune()
+            bucket = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _prune(self):
+        # A full bucket carries no state, it is identical to a new one
+        idle = [chat_id for chat_id, bucket in self._chat_buckets.items() if bucket.is_full]
+        for chat_id in idle:
+            del self._chat_buckets[chat_id]
+
+    def pause(self, seconds: float):
+        """Hold back every outbound message for `seconds`"""
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            logger.warning(f"Flood limit hit, pausing outbound messages for {seconds}s")
+            self._paused_until = until
+
+    @property
+    def is_paused(self) -> bool:
+        return self._paused_until > time.monotonic()
+
+    async def _wait_for_pause(self):
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod
+    ) -> Response:
+        bulk = bulk_traffic.get()
+        if isinstance(method, OUTBOUND_METHODS):
+            await self._wait_for_pause()
+            await self._chat_bucket(method.chat_id).acquire(bulk)
+            await self.global_bucket.acquire(bulk)
+            # The pause may have started while we were waiting for tokens
+            await self._wait_for_pause()
+        elif isinstance(method, LOOKUP_METHODS):
+            await self.lookup_bucket.acquire(bulk)
+
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as e:
+            self.pause(e.retry_after)
+            raise
@@ -0,0 +1,67 @@
+import asyncio
+import functools
+import logging
+from typing import Dict, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod, Response, GetChatMember, GetMe, GetChat
+
+logger = logging.getLogger(__name__)
+
+# Reads without side effects: identical concurrent calls are bound to get the same answer
+COALESCED_METHODS = (GetChatMember, GetMe, GetChat)
+
+
+class SingleFlightMiddleware(BaseRequestMiddleware):
+    """
+    Session middleware that collapses identical read calls made while one is
+    already in flight: they all await the first request and share its result
+    or its exception. Nothing is kept once the request finishes, so results
+    are never older than they would have been without it.
+
+    Register it before the rate limiter, so collapsed calls take no tokens.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Tuple[int, str, str], asyncio.Task] = {}
+        self.calls: Dict[str, int] = {}
+        self.collapsed: Dict[str, int] = {}
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod
+    ) -> Response:
+        if not isinstance(method, COALESCED_METHODS):
+            return await make_request(bot, method)
+
+        name = type(method).__name__
+        self.calls[name] = self.calls.get(name, 0) + 1
+        key = (bot.id, name, method.model_dump_json())
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make_request(bot, method))
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        else:
+            self.collapsed[name] = self.collapsed.get(name, 0) + 1
+            logger.debug(f"Joined in-flight {name} call")
+
+        # Shielded: a caller giving up must not cancel the request the others wait for
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Tuple[int, str, str], task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            # Marks the exception retrieved when every caller gave up before it came
+            task.exception()
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    @property
+    def total_collapsed(self) -> int:
+        return sum(self.collapsed.values())
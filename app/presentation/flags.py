@@ -0,0 +1,19 @@
+from typing import Any, Dict
+from aiogram.dispatcher.flags import get_flag
+
+# What a handler gets from the middlewares. Everything is provided unless the
+# handler (flags={...}) or its router (router.flags = {...}) sets it to False.
+DB_USER = "db_user"            # UserMiddleware's user lookup, blocked users are refused by it
+SUBSCRIPTION = "subscription"  # CheckStatusMiddleware's channel gate, needs db_user
+SESSION = "session"            # session, user_repo and referral_repo
+
+# Constant replies: no gate and no database, only the user lookup (usually
+# from memory) that keeps blocked users out
+STATIC = {SUBSCRIPTION: False, SESSION: False}
+
+def requires(data: Dict[str, Any], name: str) -> bool:
+    """Whether the handler about to run needs `name`, handler flags win over router flags"""
+    flag = get_flag(data, name)
+    if flag is None:
+        flag = getattr(data.get("event_router"), "flags", {}).get(name)
+    return flag is not False
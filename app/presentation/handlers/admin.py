@@ -5,31 +5,41 @@ import logging
 import asyncio
 import os
 import openpyxl
-from datetime import datetime
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import List, Optional
 from aiogram import Router, F
-from aiogram.filters import Command, CommandObject
-from aiogram.types import Message, BufferedInputFile, CallbackQuery, FSInputFile
-from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError
+from aiogram.filters import Command, CommandObject, Filter
+from aiogram.types import Message, BufferedInputFile, CallbackQuery, FSInputFile, TelegramObject, User as TelegramUser
+from aiogram.exceptions import TelegramForbiddenError
 from aiogram.fsm.context import FSMContext
-from sqlalchemy import select, update
+from sqlalchemy import select, update, func
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment
 
 from app.config.settings import settings
-from app.infrastructure.repositories.sqlalchemy import SQLAlchemyUserRepository, SQLAlchemyChannelRepository
-from app.infrastructure.database.models import WebinarSettings, User, Channel, WebinarCheckin, SystemSettings
-from app.utils.formatters import format_uzb_time
+from app.infrastructure.repositories.sqlalchemy import (
+    SQLAlchemyUserRepository, SQLAlchemyChannelRepository, SQLAlchemyBroadcastRepository, SQLAlchemyChannelMembershipRepository
+)
+from app.infrastructure.database.models import WebinarSettings, User, Channel, WebinarCheckin, SystemSettings, BroadcastJob
+from app.infrastructure.cache.membership import membership_cache
+from app.infrastructure.cache.subscription import subscription_gate
+from app.infrastructure.cache.users import user_cache
+from app.infrastructure.telegram.single_flight import SingleFlightMiddleware
+from app.utils.formatters import format_uzb_time, format_duration
 from app.presentation.keyboards.admin import (
     admin_kb, admin_back_kb, suspicious_users_kb, checkin_button_kb,
     webinar_admin_kb, users_admin_kb, settings_admin_kb
 )
 from app.presentation.keyboards.admin_channels import channels_list_kb, back_to_channels_kb
-from app.domain.enums import UserStatus
+from app.presentation.keyboards.admin_broadcast import (
+    broadcast_control_kb, segment_builder_kb, segment_options_kb, segment_filters,
+    broadcast_when_kb, broadcast_spread_kb
+)
+from app.domain.enums import UserStatus, BroadcastKind, BroadcastStatus
+from app.presentation.menu import MenuRouter, MenuText
 from app.presentation.states import AdminSG
-from app.infrastructure.telegram.checker import TelegramChannelChecker
-from app.use_cases.subscription import SubscriptionService
-from app.presentation.keyboards.registration import check_subscription_kb
+from app.use_cases.broadcast import BroadcastService
+from app.use_cases.broadcast_template import BroadcastTemplate, PLACEHOLDERS
 from app.presentation.keyboards.admin_webinar import (
     webinar_years_kb, webinar_months_kb, webinar_days_kb, 
     webinar_hours_kb, webinar_minutes_kb
@@ -37,31 +47,38 @@ from app.presentation.keyboards.admin_webinar import (
 
 logger = logging.getLogger(__name__)
 
-router = Router()
-
-# Limit concurrent broadcast sends to avoid flood limits (20 msgs/sec is safer)
-broadcast_semaphore = asyncio.Semaphore(20)
-
 def is_admin(user_id: int) -> bool:
     return user_id in settings.ADMIN_IDS
 
+class AdminFilter(Filter):
+    """Update from one of settings.ADMIN_IDS"""
+
+    async def __call__(self, event: TelegramObject, event_from_user: Optional[TelegramUser] = None) -> bool:
+        return event_from_user is not None and is_admin(event_from_user.id)
+
+# Checked once per update before any handler: other users' updates skip the
+# whole router instead of matching a handler that then returns
+router = MenuRouter()
+router.message.filter(AdminFilter())
+router.callback_query.filter(AdminFilter())
+
+# What non-admins get from /admin, included after `router`
+public_router = Router()
+
+@public_router.message(Command("admin"))
+async def admin_refused(message: Message):
+    await message.answer("Siz admin emassiz!")
+
 @router.message(Command("admin"))
 async def admin_panel(message: Message):
-    if not is_admin(message.from_user.id):
-        await message.answer("Siz admin emassiz!")
-        return
-    
     text = (
         "👨‍💻 <b>Admin Panel</b>\n\n"
         "Quyidagi bo'limlardan birini tanlang:"
     )
     await message.answer(text, parse_mode="HTML", reply_markup=admin_kb)
 
-@router.message(F.text == "⬅️ Orqaga")
+@router.message(MenuText("⬅️ Orqaga"))
 async def admin_back_to_main(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     await state.clear()
     text = (
         "👨‍💻 <b>Admin Panel</b>\n\n"
@@ -71,9 +88,6 @@ async def admin_back_to_main(message: Message, state: FSMContext):
 
 @router.callback_query(F.data == "back_to_admin_main")
 async def on_back_to_admin_main(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        return
-    
     await state.clear()
     text = (
         "👨‍💻 <b>Admin Panel</b>\n\n"
@@ -82,124 +96,378 @@ async def on_back_to_admin_main(callback: CallbackQuery, state: FSMContext):
     await callback.message.delete()
     await callback.message.answer(text, parse_mode="HTML", reply_markup=admin_kb)
 
-@router.message(F.text == "🏠 Asosiy menyu")
+@router.message(MenuText("🏠 Asosiy menyu"))
 async def back_to_main(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     await state.clear()
     from app.presentation.keyboards.main import main_menu_kb
     await message.answer("Asosiy menyu:", reply_markup=main_menu_kb())
 
-@router.message(F.text == "🌐 Vebinar")
+@router.message(MenuText("🌐 Vebinar"))
 async def webinar_menu(message: Message):
-    if not is_admin(message.from_user.id):
-        return
     await message.answer("🌐 <b>Vebinar bo'limi</b>", parse_mode="HTML", reply_markup=webinar_admin_kb())
 
-@router.message(F.text == "📊 Foydalanuvchilar")
+@router.message(MenuText("📊 Foydalanuvchilar"))
 async def users_menu(message: Message):
-    if not is_admin(message.from_user.id):
-        return
     await message.answer("📊 <b>Foydalanuvchilar bo'limi</b>", parse_mode="HTML", reply_markup=users_admin_kb())
 
-@router.message(F.text == "⚙️ Sozlamalar")
+@router.message(MenuText("⚙️ Sozlamalar"))
 async def settings_menu(message: Message):
-    if not is_admin(message.from_user.id):
-        return
     await message.answer("⚙️ <b>Sozlamalar bo'limi</b>", parse_mode="HTML", reply_markup=settings_admin_kb())
 
-@router.message(F.text == "📢 Rassilka")
-async def broadcast_button(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
+@router.message(MenuText("📢 Rassilka"))
+async def broadcast_button(message: Message, state: FSMContext, broadcast_service: BroadcastService):
+    await state.set_state(AdminSG.wait_broadcast_segment)
+    # A fresh flow: nothing left over from an abandoned one, a schedule least of all
+    await state.set_data({"segment": {}})
+    await message.answer("👥 <b>Rassilka auditoriyasini tanlang</b>", parse_mode="HTML", reply_markup=admin_back_kb())
+    
+    count = await broadcast_service.count_recipients()
+    await message.answer(
+        "Quyidagi mezonlar bo'yicha foydalanuvchilarni saralang:",
+        reply_markup=segment_builder_kb({}, count)
+    )
+
+@router.callback_query(AdminSG.wait_broadcast_segment, F.data.startswith("seg:"))
+async def on_segment_field(callback: CallbackQuery):
+    field = callback.data.split(":")[1]
+    await callback.message.edit_reply_markup(reply_markup=segment_options_kb(field))
+    await callback.answer()
+
+@router.callback_query(AdminSG.wait_broadcast_segment, F.data.startswith("seg_set:"))
+async def on_segment_option(callback: CallbackQuery, state: FSMContext, broadcast_service: BroadcastService):
+    _, field, index = callback.data.split(":")
+    
+    segment = (await state.get_data()).get("segment", {})
+    if index == "-1":
+        segment.pop(field, None)
+    else:
+        segment[field] = int(index)
+    await state.update_data(segment=segment)
+    
+    # Instant preview: a single COUNT over the same conditions the broadcast will use
+    count = await broadcast_service.count_recipients(segment_filters(segment))
+    await callback.message.edit_reply_markup(reply_markup=segment_builder_kb(segment, count))
+    await callback.answer()
+
+@router.callback_query(AdminSG.wait_broadcast_segment, F.data == "seg_done")
+async def on_segment_done(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(AdminSG.wait_broadcast_when)
+    await callback.message.edit_text(
+        "🕒 <b>Rassilka qachon yuborilsin?</b>",
+        parse_mode="HTML",
+        reply_markup=broadcast_when_kb()
+    )
+    await callback.answer()
+
+@router.callback_query(AdminSG.wait_broadcast_when, F.data == "bs_now")
+async def on_broadcast_now(callback: CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    data.pop("scheduled_at", None)
+    data.pop("spread_seconds", None)
+    await state.set_data(data)
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await _ask_broadcast_content(callback.message, state)
+    await callback.answer()
+
+@router.callback_query(AdminSG.wait_broadcast_when, F.data == "bs_schedule")
+async def on_broadcast_schedule(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(AdminSG.wait_broadcast_year)
+    await callback.message.edit_text(
+        "📅 <b>Rassilka yilini tanlang:</b>",
+        parse_mode="HTML",
+        reply_markup=webinar_years_kb(prefix="bs", back_callback="bs_back_to_admin")
+    )
+    await callback.answer()
+
+@router.callback_query(AdminSG.wait_broadcast_year, F.data.startswith("bs_year:"))
+async def process_bs_year_cb(callback: CallbackQuery, state: FSMContext):
+    year = callback.data.split(":")[1]
+    await state.update_data(bs_year=int(year))
+    await state.set_state(AdminSG.wait_broadcast_month)
+    await callback.message.edit_text(
+        "📅 <b>Rassilka oyini tanlang:</b>",
+        parse_mode="HTML",
+        reply_markup=webinar_months_kb(prefix="bs", back_callback="bs_back_to_year")
+    )
+
+@router.callback_query(AdminSG.wait_broadcast_month, F.data.startswith("bs_month:"))
+async def process_bs_month_cb(callback: CallbackQuery, state: FSMContext):
+    month = callback.data.split(":")[1]
+    await state.update_data(bs_month=int(month))
+    data = await state.get_data()
+    year = data['bs_year']
+    
+    await state.set_state(AdminSG.wait_broadcast_day)
+    await callback.message.edit_text(
+        "📅 <b>Rassilka kunini tanlang:</b>",
+        parse_mode="HTML",
+        reply_markup=webinar_days_kb(year, int(month), prefix="bs", back_callback="bs_back_to_month")
+    )
+
+@router.callback_query(AdminSG.wait_broadcast_day, F.data.startswith("bs_day:"))
+async def process_bs_day_cb(callback: CallbackQuery, state: FSMContext):
+    day = callback.data.split(":")[1]
+    await state.update_data(bs_day=int(day))
+    
+    await state.set_state(AdminSG.wait_broadcast_hour)
+    await callback.message.edit_text(
+        "🕐 <b>Rassilka soatini tanlang:</b>",
+        parse_mode="HTML",
+        reply_markup=webinar_hours_kb(prefix="bs", back_callback="bs_back_to_day")
+    )
+
+@router.callback_query(AdminSG.wait_broadcast_hour, F.data.startswith("bs_hour:"))
+async def process_bs_hour_cb(callback: CallbackQuery, state: FSMContext):
+    hour = callback.data.split(":")[1]
+    await state.update_data(bs_hour=int(hour))
+    
+    await state.set_state(AdminSG.wait_broadcast_minute)
+    await callback.message.edit_text(
+        "🕐 <b>Rassilka daqiqasini tanlang:</b>",
+        parse_mode="HTML",
+        reply_markup=webinar_minutes_kb(hour, prefix="bs", back_callback="bs_back_to_hour")
+    )
+
+@router.callback_query(AdminSG.wait_broadcast_minute, F.data.startswith("bs_minute:"))
+async def process_bs_minute_cb(callback: CallbackQuery, state: FSMContext):
+    minute = callback.data.split(":")[1]
+    data = await state.get_data()
+    
+    scheduled_at = datetime(data['bs_year'], data['bs_month'], data['bs_day'], data['bs_hour'], int(minute))
+    if scheduled_at <= datetime.now():
+        await callback.answer("⚠️ Bu vaqt o'tib ketgan, boshqa vaqt tanlang.", show_alert=True)
         return
     
+    await state.update_data(bs_minute=int(minute), scheduled_at=scheduled_at.isoformat())
+    await state.set_state(AdminSG.wait_broadcast_spread)
+    await callback.message.edit_text(
+        f"📅 {scheduled_at.strftime('%Y-%m-%d')} 🕐 {format_uzb_time(scheduled_at)}\n\n"
+        "⏳ <b>Xabarlar qancha vaqtga taqsimlansin?</b>\n\n"
+        "Katta auditoriyani bir vaqtda emas, tanlangan oraliqda bir tekis yuborish mumkin.",
+        parse_mode="HTML",
+        reply_markup=broadcast_spread_kb()
+    )
+
+@router.callback_query(AdminSG.wait_broadcast_spread, F.data.startswith("bs_spread:"))
+async def process_bs_spread_cb(callback: CallbackQuery, state: FSMContext):
+    spread = callback.data.split(":")[1]
+    await state.update_data(spread_seconds=int(spread))
+    
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await _ask_broadcast_content(callback.message, state)
+    await callback.answer()
+
+@router.callback_query(F.data == "bs_back_to_year")
+async def bs_back_to_year(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(AdminSG.wait_broadcast_year)
+    await callback.message.edit_text("📅 <b>Rassilka yilini tanlang:</b>", parse_mode="HTML", reply_markup=webinar_years_kb(prefix="bs", back_callback="bs_back_to_admin"))
+
+@router.callback_query(F.data == "bs_back_to_month")
+async def bs_back_to_month(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(AdminSG.wait_broadcast_month)
+    await callback.message.edit_text("📅 <b>Rassilka oyini tanlang:</b>", parse_mode="HTML", reply_markup=webinar_months_kb(prefix="bs", back_callback="bs_back_to_year"))
+
+@router.callback_query(F.data == "bs_back_to_day")
+async def bs_back_to_day(callback: CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    await state.set_state(AdminSG.wait_broadcast_day)
+    await callback.message.edit_text("📅 <b>Rassilka kunini tanlang:</b>", parse_mode="HTML", reply_markup=webinar_days_kb(data['bs_year'], data['bs_month'], prefix="bs", back_callback="bs_back_to_month"))
+
+@router.callback_query(F.data == "bs_back_to_hour")
+async def bs_back_to_hour(callback: CallbackQuery, state: FSMContext):
+    await state.set_state(AdminSG.wait_broadcast_hour)
+    await callback.message.edit_text("🕐 <b>Rassilka soatini tanlang:</b>", parse_mode="HTML", reply_markup=webinar_hours_kb(prefix="bs", back_callback="bs_back_to_day"))
+
+@router.callback_query(F.data == "bs_back_to_minute")
+async def bs_back_to_minute(callback: CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    await state.set_state(AdminSG.wait_broadcast_minute)
+    await callback.message.edit_text("🕐 <b>Rassilka daqiqasini tanlang:</b>", parse_mode="HTML", reply_markup=webinar_minutes_kb(f"{data['bs_hour']:02d}", prefix="bs", back_callback="bs_back_to_hour"))
+
+async def _ask_broadcast_content(message: Message, state: FSMContext):
     await state.set_state(AdminSG.wait_broadcast)
     await message.answer(
         "✍️ <b>Rassilka xabarini yuboring</b>\n\n"
         "Xabar matn, rasm, video yoki boshqa fayl ko'rinishida bo'lishi mumkin. "
-        "Yuborgan xabaringiz barcha foydalanuvchilarga aynan qanday bo'lsa shunday yetib boradi.",
+        "Yuborgan xabaringiz tanlangan foydalanuvchilarga aynan qanday bo'lsa shunday yetib boradi.\n\n"
+        f"Matnli xabarda {_placeholders_hint()} o'zgaruvchilarini ishlatish mumkin, "
+        "ular har bir foydalanuvchining o'z ma'lumotlari bilan almashtiriladi.",
         parse_mode="HTML",
         reply_markup=admin_back_kb()
     )
 
+def _placeholders_hint() -> str:
+    return ", ".join(f"<code>{{{name}}}</code>" for name in PLACEHOLDERS)
+
 @router.message(AdminSG.wait_broadcast)
-async def process_broadcast(message: Message, state: FSMContext, session):
-    if not is_admin(message.from_user.id):
-        return
-    
+async def process_broadcast(message: Message, state: FSMContext, broadcast_service: BroadcastService):
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
 
-    user_repo = SQLAlchemyUserRepository(session)
-    users = await user_repo.get_all_users()
-    
-    await message.answer(
-        "📤 <b>Rassilka boshlandi!</b>\n\n"
-        f"Xabar {len(users)} ta foydalanuvchiga yuboriladi. "
-        "Jarayon yakunlangach sizga hisobot beraman.",
-        parse_mode="HTML"
-    )
-    
-    # Run broadcast in background
-    asyncio.create_task(_run_manual_broadcast(message, users, message.from_user.id))
+    try:
+        payload = _broadcast_payload(message)
+    except ValueError:
+        if message.caption:
+            text = (
+                "❌ O'zgaruvchilar faqat matnli xabarda ishlaydi, rasm, video yoki fayl izohida emas.\n\n"
+                "Izohdan o'zgaruvchilarni olib tashlang yoki xabarni matn ko'rinishida yuboring."
+            )
+        else:
+            text = f"❌ Xabarda noto'g'ri o'zgaruvchi bor.\n\nFoydalanish mumkin: {_placeholders_hint()}"
+        await message.answer(text, parse_mode="HTML")
+        return
+
+    data = await state.get_data()
+    segment = data.get("segment", {})
+    label = "segment" if segment else "manual"
+
+    if data.get("scheduled_at"):
+        scheduled_at = datetime.fromisoformat(data["scheduled_at"])
+        spread = data.get("spread_seconds", 0)
+        job = await broadcast_service.create_job(
+            label,
+            segment_filters(segment),
+            status=BroadcastStatus.SCHEDULED,
+            scheduled_at=scheduled_at,
+            spread_seconds=spread,
+            created_by=message.from_user.id,
+            **payload
+        )
+        logger.info(f"Admin {message.from_user.id} scheduled broadcast job #{job.id} for {scheduled_at} to {job.total} users")
+        
+        text = (
+            f"🕒 <b>Rassilka #{job.id} rejalashtirildi!</b>\n\n"
+            f"📅 {scheduled_at.strftime('%Y-%m-%d')} 🕐 {format_uzb_time(scheduled_at)}\n"
+            f"👤 Foydalanuvchilar: {job.total}\n"
+        )
+        if spread:
+            text += f"⏳ Taqsimlash: {format_duration(spread)}\n"
+        text += "\nBekor qilish uchun: /broadcasts"
+        await message.answer(text, parse_mode="HTML")
+    else:
+        # Run broadcast in background
+        job = await _run_manual_broadcast(
+            broadcast_service, message, message.from_user.id,
+            label=label, filters=segment_filters(segment)
+        )
+        
+        await message.answer(
+            "📤 <b>Rassilka boshlandi!</b>\n\n"
+            f"Xabar {job.total} ta foydalanuvchiga yuboriladi. "
+            "Jarayon keyingi xabarda yangilanib boradi, yakunlangach sizga hisobot beraman.",
+            parse_mode="HTML"
+        )
     
     await state.clear()
     await message.answer("Boshqa amallar uchun menyudan foydalanishingiz mumkin:", reply_markup=admin_kb)
 
-async def _run_manual_broadcast(message_to_copy: Message, users: List[User], admin_id: int):
-    """Background task to perform parallel broadcast"""
-    sent_count = 0
-    blocked_count = 0
-    error_count = 0
-    admin_ids = set(settings.ADMIN_IDS)
+@router.message(Command("broadcasts"))
+async def list_broadcasts(message: Message, session):
+    repo = SQLAlchemyBroadcastRepository(session)
+    jobs = await repo.get_jobs_by_status([
+        BroadcastStatus.SCHEDULED, BroadcastStatus.PENDING, BroadcastStatus.RUNNING, BroadcastStatus.PAUSED
+    ])
     
-    async def send_to_user(user: User):
-        nonlocal sent_count, blocked_count, error_count
-        if user.telegram_id in admin_ids:
-            return
-
-        async with broadcast_semaphore:
-            try:
-                # We use copy_to to preserve media and formatting
-                await message_to_copy.copy_to(chat_id=user.telegram_id)
-                sent_count += 1
-            except TelegramForbiddenError:
-                blocked_count += 1
-            except TelegramRetryAfter as e:
-                await asyncio.sleep(e.retry_after)
-                try:
-                    await message_to_copy.copy_to(chat_id=user.telegram_id)
-                    sent_count += 1
-                except Exception:
-                    error_count += 1
-            except Exception:
-                error_count += 1
-
-    logger.info(f"Admin {admin_id} started manual broadcast to {len(users)} users")
-    tasks = [send_to_user(user) for user in users]
-    await asyncio.gather(*tasks)
-    
-    logger.info(f"Manual broadcast finished. Success: {sent_count}, Blocked: {blocked_count}, Errors: {error_count}")
+    if not jobs:
+        await message.answer("📭 Faol rassilkalar yo'q.")
+        return
     
-    try:
-        report = (
-            "✅ <b>Rassilka yakunlandi!</b>\n\n"
-            f"👤 Jami: {len(users)}\n"
-            f"✅ Yuborildi: {sent_count}\n"
-            f"🚫 Bloklagan: {blocked_count}\n"
-            f"❌ Xatoliklar: {error_count}"
+    for job in jobs:
+        done = job.sent_count + job.blocked_count + job.failed_count + job.skipped_count
+        text = (
+            f"📤 <b>Rassilka #{job.id}</b> ({job.label})\n"
+            f"Holati: {job.status}\n"
+            f"📊 Jarayon: {done}/{job.total}"
+        )
+        if job.status == BroadcastStatus.SCHEDULED:
+            text += f"\n🕒 Vaqti: {job.scheduled_at.strftime('%Y-%m-%d')} {format_uzb_time(job.scheduled_at)}"
+        if job.spread_seconds:
+            text += f"\n⏳ Taqsimlash: {format_duration(job.spread_seconds)}"
+        await message.answer(
+            text,
+            parse_mode="HTML",
+            reply_markup=broadcast_control_kb(job.id, job.status)
         )
-        await message_to_copy.bot.send_message(admin_id, report, parse_mode="HTML")
-    except Exception as e:
-        logger.error(f"Failed to send broadcast report to admin {admin_id}: {e}")
 
-@router.message(F.text == "📊 Reyting Excel")
+@router.message(Command("cachestats"))
+async def cache_stats(message: Message, single_flight: SingleFlightMiddleware):
+    collapsed = "\n".join(
+        f"• {name}: {single_flight.collapsed.get(name, 0)} / {calls}"
+        for name, calls in sorted(single_flight.calls.items())
+    )
+    await message.answer(
+        "🗂 <b>Kesh statistikasi</b>\n\n"
+        f"<b>Foydalanuvchilar</b>\n"
+        f"👥 Keshda: {len(user_cache)}\n"
+        f"✅ Keshdan: {user_cache.hits}\n"
+        f"🗄 Bazadan: {user_cache.misses}\n"
+        f"📈 Samaradorlik: {user_cache.hit_rate:.0%}\n\n"
+        f"<b>Kanal a'zoligi</b>\n"
+        f"👥 Foydalanuvchilar: {len(membership_cache)}\n"
+        f"✅ Keshdan: {membership_cache.hits}\n"
+        f"🌐 Telegramdan: {membership_cache.misses}\n"
+        f"📈 Samaradorlik: {membership_cache.hit_rate:.0%}\n\n"
+        f"<b>Obuna tekshiruvi (stale-while-revalidate)</b>\n"
+        f"⏱ Oyna: {settings.SUBSCRIPTION_STALE_SECONDS:.0f}s\n"
+        f"👥 Tasdiqlangan: {len(subscription_gate)}\n"
+        f"✅ Tekshiruvsiz o'tkazildi: {subscription_gate.hits}\n"
+        f"🔄 Fonda qayta tekshirildi: {subscription_gate.revalidations}\n"
+        f"🚫 Chiqib ketganlar: {subscription_gate.revoked}\n\n"
+        f"<b>Birlashtirilgan so'rovlar</b>\n"
+        f"🔁 Jami: {single_flight.total_collapsed} / {single_flight.total_calls}\n"
+        f"{collapsed}",
+        parse_mode="HTML"
+    )
+
+@router.callback_query(F.data.startswith("bc_"))
+async def on_broadcast_control(callback: CallbackQuery, broadcast_service: BroadcastService):
+    action, job_id = callback.data.split(":")
+    job_id = int(job_id)
+    
+    if action == "bc_pause":
+        ok = await broadcast_service.pause(job_id)
+        text = "⏸ Rassilka to'xtatilmoqda..." if ok else "Rassilka ishlamayapti."
+    elif action == "bc_resume":
+        ok = await broadcast_service.resume(job_id)
+        text = "▶️ Rassilka davom ettirildi." if ok else "Rassilkani davom ettirib bo'lmaydi."
+    else:
+        ok = await broadcast_service.cancel(job_id)
+        text = "❌ Rassilka bekor qilindi." if ok else "Rassilkani bekor qilib bo'lmaydi."
+    
+    # The panel of a stopping job updates itself, a resumed job gets a new one
+    if ok and (action == "bc_resume" or not broadcast_service.is_running(job_id)):
+        await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.answer(text)
+
+async def _run_manual_broadcast(broadcast_service: BroadcastService, message_to_copy: Message, admin_id: int, label: str = "manual", filters: Optional[dict] = None) -> BroadcastJob:
+    """Persist a broadcast job of the admin's message and start it in background"""
+    job = await broadcast_service.create_job(
+        label,
+        filters,
+        created_by=admin_id,
+        **_broadcast_payload(message_to_copy)
+    )
+    logger.info(f"Admin {admin_id} started manual broadcast job #{job.id} to {job.total} users")
+    broadcast_service.start(job.id)
+    return job
+
+def _broadcast_payload(message: Message) -> dict:
+    """
+    A text with placeholders becomes a per-user template. Anything else is sent
+    with copy_message, to preserve media and formatting.
+    Raises ValueError on an unknown placeholder, and on placeholders in a media
+    caption: a copy would show them as they are.
+    """
+    if message.caption and BroadcastTemplate.has_placeholders(message.caption):
+        raise ValueError("Placeholders are only supported in text messages")
+    if message.text and BroadcastTemplate.has_placeholders(message.text):
+        BroadcastTemplate(message.html_text)
+        return {"kind": BroadcastKind.TEMPLATE, "text": message.html_text, "parse_mode": "HTML"}
+    return {"kind": BroadcastKind.COPY, "from_chat_id": message.chat.id, "message_id": message.message_id}
+
+@router.message(MenuText("📊 Reyting Excel"))
 async def export_excel(message: Message, session):
-    if not is_admin(message.from_user.id):
-        return
-        
     user_repo = SQLAlchemyUserRepository(session)
     users = await user_repo.get_top_users_by_balance(limit=10000)
     
@@ -236,11 +504,8 @@ async def export_excel(message: Message, session):
     document = BufferedInputFile(output.getvalue(), filename="reyting.xlsx")
     await message.answer_document(document, caption="📊 <b>Reyting (Excel)</b>", parse_mode="HTML")
 
-@router.message(F.text == "⚠️ Shubhali foydalanuvchilar")
+@router.message(MenuText("⚠️ Shubhali foydalanuvchilar"))
 async def suspicious_users(message: Message, session):
-    if not is_admin(message.from_user.id):
-        return
-    
     stmt = select(User).where(User.full_name == None).order_by(User.created_at.desc()).limit(20)
     result = await session.execute(stmt)
     suspicious = result.scalars().all()
@@ -261,9 +526,6 @@ async def suspicious_users(message: Message, session):
 
 @router.callback_query(F.data == "send_to_suspicious")
 async def ask_suspicious_broadcast(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        return
-        
     await state.set_state(AdminSG.wait_suspicious_broadcast_content)
     await callback.message.answer(
         "✍️ <b>Barcha shubhali foydalanuvchilarga xabar yuborish</b>\n\n"
@@ -275,41 +537,44 @@ async def ask_suspicious_broadcast(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 @router.message(AdminSG.wait_suspicious_broadcast_content)
-async def process_suspicious_broadcast(message: Message, state: FSMContext, session):
-    if not is_admin(message.from_user.id):
-        return
-        
+async def process_suspicious_broadcast(message: Message, state: FSMContext, session, broadcast_service: BroadcastService):
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
 
-    # Fetch all suspicious users
-    stmt = select(User).where(User.full_name == None)
-    result = await session.execute(stmt)
-    users = result.scalars().all()
+    # Count suspicious users without loading them
+    stmt = select(func.count()).select_from(User).where(User.full_name == None)
+    total = await session.scalar(stmt)
     
-    if not users:
+    if not total:
         await message.answer("❌ Shubhali foydalanuvchilar topilmadi.")
         await state.clear()
         return
 
+    # Reuse the manual broadcast logic function
+    try:
+        job = await _run_manual_broadcast(
+            broadcast_service, message, message.from_user.id,
+            label="suspicious", filters={"full_name_missing": True}
+        )
+    except ValueError:
+        await message.answer(
+            f"❌ Xabarda noto'g'ri o'zgaruvchi bor.\n\nFoydalanish mumkin: {_placeholders_hint()}",
+            parse_mode="HTML"
+        )
+        return
+    
     await message.answer(
         f"📤 <b>Rassilka boshlandi!</b>\n"
-        f"Xabar {len(users)} ta shubhali foydalanuvchiga yuboriladi.",
+        f"Xabar {job.total} ta shubhali foydalanuvchiga yuboriladi.",
         parse_mode="HTML"
     )
     
-    # Reuse the manual broadcast logic function
-    asyncio.create_task(_run_manual_broadcast(message, users, message.from_user.id))
-    
     await state.clear()
     await message.answer("Jarayon fonda davom etmoqda...", reply_markup=admin_kb)
 
 @router.message(Command("block"))
 async def block_user(message: Message, command: CommandObject, session):
-    if not is_admin(message.from_user.id):
-        return
-    
     if not command.args:
         await message.answer("Foydalanuvchi ID sini kiriting: /block 123456789")
         return
@@ -319,15 +584,13 @@ async def block_user(message: Message, command: CommandObject, session):
         stmt = update(User).where(User.telegram_id == telegram_id).values(status=UserStatus.BLOCKED)
         await session.execute(stmt)
         await session.commit()
+        user_cache.invalidate(telegram_id)
         await message.answer(f"✅ Foydalanuvchi {telegram_id} bloklandi.")
     except Exception as e:
         await message.answer(f"❌ Xato: {e}")
 
 @router.message(Command("reset"))
 async def reset_balance(message: Message, command: CommandObject, session):
-    if not is_admin(message.from_user.id):
-        return
-    
     if not command.args:
         await message.answer("Foydalanuvchi ID sini kiriting: /reset 123456789")
         return
@@ -337,16 +600,14 @@ async def reset_balance(message: Message, command: CommandObject, session):
         stmt = update(User).where(User.telegram_id == telegram_id).values(balance=0)
         await session.execute(stmt)
         await session.commit()
+        user_cache.invalidate(telegram_id)
         await message.answer(f"✅ Foydalanuvchi {telegram_id} ballari 0 ga tushirildi.")
 
     except Exception as e:
         await message.answer(f"❌ Xato: {e}")
 
-@router.message(F.text == "✅ Check-in")
+@router.message(MenuText("✅ Check-in"))
 async def checkin_ask_text(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-        
     await state.set_state(AdminSG.wait_checkin_text)
     await message.answer(
         "✍️ <b>Check-in xabar matnini kiriting:</b>\n"
@@ -358,9 +619,6 @@ async def checkin_ask_text(message: Message, state: FSMContext):
 
 @router.message(AdminSG.wait_checkin_text)
 async def process_checkin_text(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
@@ -381,9 +639,6 @@ async def process_checkin_text(message: Message, state: FSMContext):
 
 @router.message(AdminSG.wait_checkin_channel)
 async def process_checkin_channel(message: Message, state: FSMContext, bot):
-    if not is_admin(message.from_user.id):
-        return
-        
     target = message.text.strip()
     
     # Try to extract username from link if present
@@ -416,9 +671,6 @@ async def process_checkin_channel(message: Message, state: FSMContext, bot):
 
 @router.message(Command("send"))
 async def send_message_command(message: Message, command: CommandObject, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     # If ID provided in command
     if command.args:
         try:
@@ -444,9 +696,6 @@ async def send_message_command(message: Message, command: CommandObject, state:
 
 @router.message(AdminSG.wait_send_message_id)
 async def process_send_message_id(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
@@ -465,10 +714,7 @@ async def process_send_message_id(message: Message, state: FSMContext):
         await message.answer("❌ ID raqam bo'lishi kerak! Qaytadan kiriting:")
 
 @router.message(AdminSG.wait_send_message_content)
-async def process_send_message_content(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-
+async def process_send_message_content(message: Message, state: FSMContext, session):
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
@@ -497,17 +743,15 @@ async def process_send_message_content(message: Message, state: FSMContext):
         await state.clear()
         
     except TelegramForbiddenError:
+        await SQLAlchemyUserRepository(session).mark_unreachable([target_id])
         await message.answer(f"🚫 Foydalanuvchi ({target_id}) botni bloklagan.")
         await state.clear()
     except Exception as e:
         await message.answer(f"❌ Yuborishda xatolik: {e}")
         await state.clear()
 
-@router.message(F.text == "⏰ Vebinar vaqti")
+@router.message(MenuText("⏰ Vebinar vaqti"))
 async def set_webinar_time_button(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     await state.set_state(AdminSG.wait_webinar_year)
     await message.answer(
         "📅 <b>Vebinar yilini tanlang:</b>",
@@ -623,9 +867,6 @@ async def wb_back_to_hour(callback: CallbackQuery, state: FSMContext):
 
 @router.message(AdminSG.wait_webinar_link)
 async def process_webinar_link(message: Message, state: FSMContext, session):
-    if not is_admin(message.from_user.id):
-        return
-        
     if message.text == "⬅️ Orqaga":
         data = await state.get_data()
         hour = str(data.get('wb_hour', '00')).zfill(2)
@@ -671,43 +912,48 @@ async def process_webinar_link(message: Message, state: FSMContext, session):
         reply_markup=admin_kb
     )
 
-@router.message(F.text == "📢 Kanallarni boshqarish")
+@router.message(MenuText("📢 Kanallarni boshqarish"))
 async def list_channels(message: Message, session):
-    if not is_admin(message.from_user.id):
-        return
-    
     repo = SQLAlchemyChannelRepository(session)
     channels = await repo.get_all()
     
     await message.answer(
-        "📢 <b>Kanallarni boshqarish</b>\n\n"
-        "Quyida qo'shilgan kanallar ro'yxati keltirilgan. "
-        "Kanalni o'chirish uchun uning nomini bosing:",
+        await _channels_list_text(session, channels),
         parse_mode="HTML",
         reply_markup=channels_list_kb(channels)
     )
 
 @router.callback_query(F.data == "back_to_channels_list")
 async def on_back_to_channels_list(callback: CallbackQuery, session):
-    if not is_admin(callback.from_user.id):
-        return
-    
     repo = SQLAlchemyChannelRepository(session)
     channels = await repo.get_all()
     
     await callback.message.edit_text(
-        "📢 <b>Kanallarni boshqarish</b>\n\n"
-        "Quyida qo'shilgan kanallar ro'yxati keltirilgan. "
-        "Kanalni o'chirish uchun uning nomini bosing:",
+        await _channels_list_text(session, channels),
         parse_mode="HTML",
         reply_markup=channels_list_kb(channels)
     )
 
+async def _channels_list_text(session, channels: List[Channel]) -> str:
+    # Counted from chat_member updates and the membership sweeper, so only bot users are included
+    repo = SQLAlchemyChannelMembershipRepository(session)
+    counts = await repo.count_members()
+    churn = await repo.get_churn(since=date.today() - timedelta(days=6))
+    text = (
+        "📢 <b>Kanallarni boshqarish</b>\n\n"
+        "Quyida qo'shilgan kanallar ro'yxati keltirilgan. "
+        "Kanalni o'chirish uchun uning nomini bosing:\n\n"
+    )
+    for ch in channels:
+        joined, left = churn.get(ch.channel_id, (0, 0))
+        text += (
+            f"• {ch.name}: 👥 {counts.get(ch.channel_id, 0)} ta bot foydalanuvchisi a'zo\n"
+            f"   7 kunda: ➕ {joined} qo'shildi, ➖ {left} chiqdi\n"
+        )
+    return text
+
 @router.callback_query(F.data == "add_channel")
 async def on_add_channel(callback: CallbackQuery, state: FSMContext):
-    if not is_admin(callback.from_user.id):
-        return
-    
     await state.set_state(AdminSG.wait_channel_name)
     await callback.message.edit_text(
         "✍️ Kanal nomini kiriting (masalan: Robotronix):",
@@ -716,9 +962,6 @@ async def on_add_channel(callback: CallbackQuery, state: FSMContext):
 
 @router.message(AdminSG.wait_channel_name)
 async def process_channel_name(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
@@ -734,9 +977,6 @@ async def process_channel_name(message: Message, state: FSMContext):
 
 @router.message(AdminSG.wait_channel_id)
 async def process_channel_id(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
@@ -749,10 +989,7 @@ async def process_channel_id(message: Message, state: FSMContext):
     )
 
 @router.message(AdminSG.wait_channel_link)
-async def process_channel_link(message: Message, state: FSMContext, session, bot):
-    if not is_admin(message.from_user.id):
-        return
-    
+async def process_channel_link(message: Message, state: FSMContext, session, broadcast_service: BroadcastService):
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
@@ -764,46 +1001,34 @@ async def process_channel_link(message: Message, state: FSMContext, session, bot
     
     repo = SQLAlchemyChannelRepository(session)
     await repo.add_channel(ch_id, name, link)
+    membership_cache.invalidate_channel(ch_id)
+    # Nobody is confirmed for the new channel yet
+    subscription_gate.clear()
     
     await state.clear()
     await message.answer(f"✅ Kanal '{name}' muvaffaqiyatli qo'shildi!", reply_markup=admin_kb)
     
-    user_repo = SQLAlchemyUserRepository(session)
-    users = await user_repo.get_all_users()
-    
-    checker = TelegramChannelChecker(bot)
-    sub_service = SubscriptionService(repo, checker)
-    
     broadcast_text = (
         f"📣 <b>Yangi kanal qo'shildi!</b>\n\n"
         f"Botdan foydalanishda davom etish uchun quyidagi kanallarga, jumladan <b>{name}</b> kanaliga obuna bo'lishingiz shart:"
     )
     
-    count = 0
-    admin_ids = set(settings.ADMIN_IDS)
-    logger.info(f"Starting targeted broadcast for new channel '{name}'...")
+    # Membership checks and sends run as a background job, only users
+    # missing a channel get the notice
+    job = await broadcast_service.create_job(
+        "new_channel",
+        kind=BroadcastKind.SUBSCRIPTION,
+        created_by=message.from_user.id,
+        text=broadcast_text,
+        parse_mode="HTML"
+    )
+    broadcast_service.start(job.id)
+    logger.info(f"Started targeted broadcast job #{job.id} for new channel '{name}'")
     
-    for u in users:
-        # Strictly exclude admins
-        if u.telegram_id in admin_ids:
-            continue
-            
-        # Check if user needs to subscribe to anything
-        is_subbed, unsubscribed = await sub_service.check_user_subscription(u.telegram_id)
-        
-        if not is_subbed:
-            try:
-                await bot.send_message(
-                    u.telegram_id, 
-                    broadcast_text, 
-                    parse_mode="HTML", 
-                    reply_markup=check_subscription_kb(unsubscribed)
-                )
-                count += 1
-            except Exception:
-                pass
-            
-    await message.answer(f"📢 Xabar faqat a'zo bo'lmagan {count} ta foydalanuvchiga yuborildi.")
+    await message.answer(
+        f"📢 {job.total} ta foydalanuvchi obunasi tekshirilmoqda. "
+        "Xabar faqat a'zo bo'lmaganlarga yuboriladi, yakunlangach hisobot beraman."
+    )
     
     channels = await repo.get_all()
     await message.answer(
@@ -813,23 +1038,23 @@ async def process_channel_link(message: Message, state: FSMContext, session, bot
 
 @router.callback_query(F.data.startswith("del_channel:"))
 async def on_delete_channel(callback: CallbackQuery, session):
-    if not is_admin(callback.from_user.id):
-        return
-    
     channel_id = int(callback.data.split(":")[1])
+    channel = await session.get(Channel, channel_id)
     repo = SQLAlchemyChannelRepository(session)
     await repo.delete_channel(channel_id)
+    if channel:
+        # Added again later, the channel must not trust what was known before
+        await SQLAlchemyChannelMembershipRepository(session).delete_channel_memberships(channel.channel_id)
+        membership_cache.invalidate_channel(channel.channel_id)
+    subscription_gate.clear()
     
     await callback.answer("Kanal o'chirildi ✅")
     
     channels = await repo.get_all()
     await callback.message.edit_reply_markup(reply_markup=channels_list_kb(channels))
 
-@router.message(F.text == "💾 Bazani yuklash")
+@router.message(MenuText("💾 Bazani yuklash"))
 async def backup_db(message: Message):
-    if not is_admin(message.from_user.id):
-        return
-    
     from app.use_cases.backup import BackupService
     backup_service = BackupService()
     
@@ -842,11 +1067,8 @@ async def backup_db(message: Message):
     except Exception as e:
         await message.answer(f"❌ Xatolik yuz berdi: {e}")
 
-@router.message(F.text == "♻️ Bazani tiklash")
+@router.message(MenuText("♻️ Bazani tiklash"))
 async def restore_db_ask(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     await state.set_state(AdminSG.wait_restore)
     await message.answer(
         "📂 <b>Bazani tiklash</b>\n\n"
@@ -858,9 +1080,6 @@ async def restore_db_ask(message: Message, state: FSMContext):
 
 @router.message(AdminSG.wait_restore, F.document)
 async def process_restore_db(message: Message, state: FSMContext, bot):
-    if not is_admin(message.from_user.id):
-        return
-        
     document = message.document
     if not document.file_name.endswith('.xlsx'):
         await message.answer("❌ Faqat .xlsx formatidagi Excel faylni yuboring!")
@@ -881,11 +1100,8 @@ async def process_restore_db(message: Message, state: FSMContext, bot):
     except Exception as e:
         await message.answer(f"❌ Xatolik yuz berdi: {e}")
 
-@router.message(F.text == "📥 Vebinar qatnashchilari")
+@router.message(MenuText("📥 Vebinar qatnashchilari"))
 async def export_webinar_participants(message: Message, session):
-    if not is_admin(message.from_user.id):
-        return
-        
     await message.answer("📥 Vebinar qatnashchilarini yuklab olinmoqda...")
     
     try:
@@ -938,11 +1154,8 @@ async def export_webinar_participants(message: Message, session):
         logger.error(f"Export error: {e}")
         await message.answer(f"❌ Eksport xatoligi: {e}")
 
-@router.message(F.text == "♻️ Vebinar tiklash")
+@router.message(MenuText("♻️ Vebinar tiklash"))
 async def ask_webinar_restore(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-        
     await state.set_state(AdminSG.wait_webinar_restore)
     await message.answer(
         "📂 <b>Vebinar qatnashchilarini tiklash</b>\n\n"
@@ -955,9 +1168,6 @@ async def ask_webinar_restore(message: Message, state: FSMContext):
 
 @router.message(AdminSG.wait_webinar_restore, F.document)
 async def process_webinar_restore(message: Message, state: FSMContext, bot, session):
-    if not is_admin(message.from_user.id):
-        return
-        
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
@@ -1047,11 +1257,8 @@ async def process_webinar_restore(message: Message, state: FSMContext, bot, sess
         logger.error(f"Restore error: {e}", exc_info=True)
         await message.answer(f"❌ Xatolik yuz berdi: {e}")
 
-@router.message(F.text == "🛑 Ball yig'ishni to'xtatish")
+@router.message(MenuText("🛑 Ball yig'ishni to'xtatish"))
 async def set_point_stop_time_button(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     await state.set_state(AdminSG.wait_point_stop_year)
     await message.answer(
         "📅 <b>Ball yig'ish to'xtatish yilini tanlang:</b>",
@@ -1059,7 +1266,7 @@ async def set_point_stop_time_button(message: Message, state: FSMContext):
         reply_markup=webinar_years_kb(prefix="ps", back_callback="ps_back_to_admin")
     )
 
-@router.callback_query(F.data == "ps_back_to_admin")
+@router.callback_query(F.data.in_({"ps_back_to_admin", "bs_back_to_admin"}))
 async def ps_back_to_admin_cb(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await callback.message.delete()
@@ -1177,11 +1384,8 @@ async def ps_back_to_hour(callback: CallbackQuery, state: FSMContext):
     await state.set_state(AdminSG.wait_point_stop_hour)
     await callback.message.edit_text("🕐 <b>Ball yig'ish to'xtatish soatini tanlang:</b>", parse_mode="HTML", reply_markup=webinar_hours_kb(prefix="ps", back_callback="ps_back_to_day"))
 
-@router.message(F.text == "▶️ Ball yig'ishni tiklash")
+@router.message(MenuText("▶️ Ball yig'ishni tiklash"))
 async def resume_point_collection(message: Message, session):
-    if not is_admin(message.from_user.id):
-        return
-    
     # Clear the point collection end time
     stmt = select(SystemSettings).limit(1)
     result = await session.execute(stmt)
@@ -1203,11 +1407,8 @@ async def resume_point_collection(message: Message, session):
             reply_markup=admin_kb
         )
 
-@router.message(F.text == "🗑 Vebinar tozalash")
+@router.message(MenuText("🗑 Vebinar tozalash"))
 async def clear_webinar_confirm(message: Message, state: FSMContext):
-    if not is_admin(message.from_user.id):
-        return
-    
     from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
     await state.set_state(AdminSG.wait_clear_webinar_confirm)
     await message.answer(
@@ -1226,9 +1427,6 @@ async def clear_webinar_confirm(message: Message, state: FSMContext):
 
 @router.message(AdminSG.wait_clear_webinar_confirm)
 async def process_clear_webinar(message: Message, state: FSMContext, session):
-    if not is_admin(message.from_user.id):
-        return
-    
     if message.text == "⬅️ Orqaga":
         await admin_back_to_main(message, state)
         return
@@ -0,0 +1,35 @@
+import logging
+from aiogram import Router
+from aiogram.types import ChatMemberUpdated
+
+from app.infrastructure.cache.membership import membership_cache
+from app.infrastructure.cache.subscription import subscription_gate
+from app.infrastructure.repositories.sqlalchemy import SQLAlchemyChannelRepository, SQLAlchemyChannelMembershipRepository
+from app.infrastructure.telegram.checker import MEMBER_STATUSES
+from app.presentation.flags import DB_USER, SUBSCRIPTION
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+# Updates about channel members, not about bot users talking to the bot
+router.flags = {DB_USER: False, SUBSCRIPTION: False}
+
+@router.chat_member()
+async def on_channel_member_updated(event: ChatMemberUpdated, session):
+    """Joins and leaves in the required channels, delivered because the bot is an admin there"""
+    channel = await SQLAlchemyChannelRepository(session).get_by_chat(event.chat.id, event.chat.username)
+    if not channel:
+        return
+
+    user_id = event.new_chat_member.user.id
+    is_member = event.new_chat_member.status in MEMBER_STATUSES
+    was_member = event.old_chat_member.status in MEMBER_STATUSES
+    repo = SQLAlchemyChannelMembershipRepository(session)
+    await repo.set_membership(channel.channel_id, user_id, is_member)
+    if is_member != was_member:
+        await repo.record_churn(channel.channel_id, joined=int(is_member), left=int(was_member))
+    membership_cache.set(user_id, channel.channel_id, is_member)
+    if not is_member:
+        # Gated again on the next update, even in stale-while-revalidate mode
+        subscription_gate.invalidate(user_id)
+    logger.debug(f"Membership update: user={user_id}, channel={channel.channel_id}, is_member={is_member}")
@@ -1,5 +1,5 @@
 import re
-from aiogram import Router, F
+from aiogram import F
 from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.fsm.context import FSMContext
 
@@ -8,11 +8,12 @@ from app.domain.enums import StudyStatus, AgeRange
 from app.presentation.keyboards.profile import profile_menu_kb, edit_fields_kb, phone_edit_options_kb
 from app.presentation.keyboards.registration import regions_kb, phone_kb, study_status_kb, age_range_kb
 from app.presentation.keyboards.main import main_menu_kb
+from app.presentation.menu import MenuRouter, MenuText
 from app.presentation.states import ProfileSG
 
-router = Router()
+router = MenuRouter()
 
-@router.message(F.text == "👤 Profil")
+@router.message(MenuText("👤 Profil"))
 async def show_profile(message: Message, db_user, referral_repo: AbstractReferralRepository, state: FSMContext):
     await state.clear()
 
@@ -202,9 +203,9 @@ async def back_to_fields(callback: CallbackQuery, state: FSMContext):
         )
         await state.set_state(ProfileSG.main)
 
-@router.message(ProfileSG.edit_name, F.text == "⬅️ Bekor qilish")
-@router.message(ProfileSG.edit_phone, F.text == "⬅️ Bekor qilish")
-@router.message(ProfileSG.edit_phone_2, F.text == "⬅️ Bekor qilish")
+@router.message(ProfileSG.edit_name, MenuText("⬅️ Bekor qilish"))
+@router.message(ProfileSG.edit_phone, MenuText("⬅️ Bekor qilish"))
+@router.message(ProfileSG.edit_phone_2, MenuText("⬅️ Bekor qilish"))
 async def cancel_edit(message: Message, state: FSMContext, db_user, referral_repo: AbstractReferralRepository):
     await state.set_state(ProfileSG.main)
     count = await referral_repo.get_referral_count(db_user.telegram_id)
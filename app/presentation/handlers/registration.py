@@ -13,8 +13,9 @@ from app.presentation.states import RegistrationSG
 from app.presentation.keyboards.registration import check_subscription_kb, phone_kb, regions_kb, study_status_kb, age_range_kb
 from app.presentation.keyboards.main import main_menu_kb
 from app.domain.enums import UserStatus, StudyStatus, AgeRange
-from app.infrastructure.repositories.sqlalchemy import SQLAlchemyChannelRepository
+from app.infrastructure.repositories.sqlalchemy import SQLAlchemyChannelRepository, SQLAlchemyChannelMembershipRepository
 from app.infrastructure.telegram.checker import TelegramChannelChecker
+from app.infrastructure.cache.membership import membership_cache
 from app.infrastructure.database.models import User, WebinarCheckin
 
 router = Router()
@@ -90,7 +91,7 @@ async def cmd_start(
     # Check Channels
     channel_repo = SQLAlchemyChannelRepository(session)
     checker = TelegramChannelChecker(bot)
-    sub_service = SubscriptionService(channel_repo, checker)
+    sub_service = SubscriptionService(channel_repo, checker, SQLAlchemyChannelMembershipRepository(session))
     
     is_subbed, unsubscribed = await sub_service.check_user_subscription(message.from_user.id)
     
@@ -126,12 +127,15 @@ async def on_check_subscription(
 ):
     channel_repo = SQLAlchemyChannelRepository(session)
     checker = TelegramChannelChecker(bot)
-    sub_service = SubscriptionService(channel_repo, checker)
+    sub_service = SubscriptionService(channel_repo, checker, SQLAlchemyChannelMembershipRepository(session))
     
     # SAFEGUARD: If db_user is None (e.g. after restore), use telegram ID directly
     telegram_id = db_user.telegram_id if db_user else callback.from_user.id
     
-    is_subbed, unsubscribed = await sub_service.check_user_subscription(telegram_id)
+    # The user says they just subscribed, so ask Telegram instead of the cache
+    membership_cache.invalidate_user(telegram_id)
+    
+    is_subbed, unsubscribed = await sub_service.check_user_subscription(telegram_id, recheck=True)
     
     if is_subbed:
         # If user is in registration flow
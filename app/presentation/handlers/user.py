@@ -1,12 +1,15 @@
-from aiogram import Router, F
-from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram import F
+from aiogram.filters import ChatMemberUpdatedFilter, KICKED, MEMBER
+from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, ChatMemberUpdated
 from urllib.parse import quote
 
 from app.domain.repositories import AbstractUserRepository, AbstractReferralRepository
 from app.use_cases.leaderboard import LeaderboardService
 from app.config.settings import settings
+from app.presentation.flags import STATIC
+from app.presentation.menu import MenuRouter, MenuText
 
-router = Router()
+router = MenuRouter()
 
 from textwrap import dedent
 from sqlalchemy import select
@@ -17,7 +20,7 @@ from app.domain.enums import UserStatus
 from app.infrastructure.database.models import User, WebinarCheckin
 from app.infrastructure.repositories.sqlalchemy import SQLAlchemyUserRepository
 
-@router.message(F.text == "➕ Ball yig‘ish")
+@router.message(MenuText("➕ Ball yig‘ish"))
 async def show_points_and_link(
     message: Message,
     db_user,
@@ -77,7 +80,7 @@ async def show_points_and_link(
     )
     await message.answer(text, parse_mode="HTML", reply_markup=keyboard)
 
-@router.message(F.text == "💰 Ballarim")
+@router.message(MenuText("💰 Ballarim"))
 async def show_my_points(
     message: Message,
     db_user,
@@ -100,7 +103,7 @@ async def show_my_points(
     await message.answer(text, parse_mode="HTML")
 
 
-@router.message(F.text == "📊 Reyting (TOP-50)")
+@router.message(MenuText("📊 Reyting (TOP-50)"))
 async def show_leaderboard(
     message: Message,
     user_repo: AbstractUserRepository,
@@ -125,7 +128,7 @@ async def show_leaderboard(
     
     await message.answer(text, parse_mode="HTML")
 
-@router.message(F.text == "🎁 Sovg‘alar va Shartlar")
+@router.message(MenuText("🎁 Sovg‘alar va Shartlar"), flags=STATIC)
 async def show_rewards(message: Message):
     text = (
         "<b>ZAMONAVIY USTOZ — 2025 tanlovi sovrinlari:</b>\n"
@@ -150,7 +153,7 @@ async def show_rewards(message: Message):
     )
     await message.answer(text, parse_mode="HTML")
 
-@router.message(F.text == "🎓 Kurslar haqida")
+@router.message(MenuText("🎓 Kurslar haqida"), flags=STATIC)
 async def show_courses(message: Message):
     text = (
         "<b>🎓 ROBOTRONIX BILAN KASBIY MAHORATINGIZNI OSHIRING!</b>\n"
@@ -178,7 +181,7 @@ async def show_courses(message: Message):
     )
     await message.answer(text, parse_mode="HTML")
 
-@router.message(F.text == "📞 Bog‘lanish")
+@router.message(MenuText("📞 Bog‘lanish"), flags=STATIC)
 async def show_contact(message: Message):
     text = (
         "<b>Biz bilan bog'lanish:</b>\n\n"
@@ -191,3 +194,12 @@ async def show_contact(message: Message):
     await message.answer(text, parse_mode="HTML")
 
 
+@router.my_chat_member(F.chat.type == "private", ChatMemberUpdatedFilter(member_status_changed=KICKED))
+async def on_bot_blocked(event: ChatMemberUpdated, user_repo: AbstractUserRepository):
+    # Excluded from broadcasts and reminders until the user comes back
+    await user_repo.mark_unreachable([event.from_user.id])
+
+
+@router.my_chat_member(F.chat.type == "private", ChatMemberUpdatedFilter(member_status_changed=MEMBER))
+async def on_bot_unblocked(event: ChatMemberUpdated, user_repo: AbstractUserRepository):
+    await user_repo.clear_unreachable(event.from_user.id)
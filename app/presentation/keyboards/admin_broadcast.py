@@ -0,0 +1,74 @@
+from typing import Dict, Optional
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from app.domain.enums import BroadcastStatus, Region, AgeRange, StudyStatus, UserStatus
+
+# Segment builder: field -> (button title, [(option label, audience filters)])
+SEGMENTS = {
+    "region": ("📍 Hudud", [(r.value, {"region": r.value}) for r in Region]),
+    "age_range": ("🎂 Yosh", [(a.value, {"age_range": a.value}) for a in AgeRange]),
+    "study_status": ("🎓 O'qish", [(s.value, {"study_status": s.value}) for s in StudyStatus]),
+    "status": ("👤 Holat", [
+        ("Faol", {"status": [UserStatus.ACTIVE]}),
+        ("Ro'yxatdan to'liq o'tmaganlar", {"status": [UserStatus.NEW, UserStatus.WAIT_CHANNEL, UserStatus.WAIT_SURVEY]}),
+    ]),
+    "balance": ("💰 Ball", [
+        ("0", {"balance_max": 0}),
+        ("1 - 99", {"balance_min": 1, "balance_max": 99}),
+        ("100 - 499", {"balance_min": 100, "balance_max": 499}),
+        ("500+", {"balance_min": 500}),
+    ]),
+    "has_voucher": ("🎟 Vaucher", [("Bor", {"has_voucher": True}), ("Yo'q", {"has_voucher": False})]),
+    "checked_in": ("✅ Vebinar check-in", [("Qatnashgan", {"checked_in": True}), ("Qatnashmagan", {"checked_in": False})]),
+}
+
+def segment_filters(selection: Dict[str, int]) -> dict:
+    """Audience filters of the selected option index per segment field"""
+    filters = {}
+    for field, index in selection.items():
+        filters.update(SEGMENTS[field][1][index][1])
+    return filters
+
+def segment_builder_kb(selection: Dict[str, int], count: int) -> InlineKeyboardMarkup:
+    keyboard = []
+    for field, (title, options) in SEGMENTS.items():
+        index = selection.get(field)
+        value = options[index][0] if index is not None else "Barchasi"
+        keyboard.append([InlineKeyboardButton(text=f"{title}: {value}", callback_data=f"seg:{field}")])
+    keyboard.append([InlineKeyboardButton(text=f"➡️ Davom etish ({count} ta)", callback_data="seg_done")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+def segment_options_kb(field: str) -> InlineKeyboardMarkup:
+    keyboard = [[InlineKeyboardButton(text="Barchasi", callback_data=f"seg_set:{field}:-1")]]
+    for index, (label, _) in enumerate(SEGMENTS[field][1]):
+        keyboard.append([InlineKeyboardButton(text=label, callback_data=f"seg_set:{field}:{index}")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+# Windows a scheduled broadcast can be spread over: (label, seconds)
+SPREAD_OPTIONS = [("Yo'q, darhol", 0), ("30 daqiqa", 1800), ("1 soat", 3600), ("3 soat", 10800), ("6 soat", 21600)]
+
+def broadcast_when_kb() -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🚀 Hozir yuborish", callback_data="bs_now")],
+        [InlineKeyboardButton(text="🕒 Rejalashtirish", callback_data="bs_schedule")],
+    ])
+
+def broadcast_spread_kb() -> InlineKeyboardMarkup:
+    keyboard = [
+        [InlineKeyboardButton(text=label, callback_data=f"bs_spread:{seconds}")]
+        for label, seconds in SPREAD_OPTIONS
+    ]
+    keyboard.append([InlineKeyboardButton(text="⬅️ Orqaga", callback_data="bs_back_to_minute")])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+def broadcast_control_kb(job_id: int, status: BroadcastStatus) -> Optional[InlineKeyboardMarkup]:
+    """Pause/resume/cancel buttons of a broadcast, None once it can no longer be controlled"""
+    if status == BroadcastStatus.SCHEDULED:
+        row = []
+    elif status == BroadcastStatus.RUNNING:
+        row = [InlineKeyboardButton(text="⏸ To'xtatish", callback_data=f"bc_pause:{job_id}")]
+    elif status == BroadcastStatus.PAUSED:
+        row = [InlineKeyboardButton(text="▶️ Davom ettirish", callback_data=f"bc_resume:{job_id}")]
+    else:
+        return None
+    row.append(InlineKeyboardButton(text="❌ Bekor qilish", callback_data=f"bc_cancel:{job_id}"))
+    return InlineKeyboardMarkup(inline_keyboard=[row])
@@ -1,9 +1,9 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 from app.domain.enums import Region, StudyStatus, AgeRange
-from app.infrastructure.database.models import Channel
+from app.infrastructure.cache.channels import ChannelSnapshot
 from typing import List
 
-def check_subscription_kb(channels: List[Channel]) -> InlineKeyboardMarkup:
+def check_subscription_kb(channels: List[ChannelSnapshot]) -> InlineKeyboardMarkup:
     keyboard = []
     for ch in channels:
         keyboard.append([InlineKeyboardButton(text=f"➕ {ch.name}", url=ch.link)])
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional
+from aiogram import Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import Filter
+from aiogram.types import Message, TelegramObject
+
+class MenuText(Filter):
+    """
+    Message text equal to `text`, what a reply keyboard button sends.
+
+    Works as a plain filter anywhere. On a MenuRouter, handlers using it are
+    found by a dict lookup on the text instead of being tried one by one.
+    Unlike F.text == ..., which aiogram runs in a worker thread because it
+    is synchronous, checking it never leaves the event loop.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    async def __call__(self, message: Message) -> bool:
+        return message.text == self.text
+
+def _menu_text(handler: HandlerObject) -> Optional[str]:
+    for event_filter in handler.filters or ():
+        if isinstance(event_filter.callback, MenuText):
+            return event_filter.callback.text
+    return None
+
+class MenuObserver(TelegramEventObserver):
+    """
+    Message observer that only tries the handlers a message can match:
+    handlers with a MenuText for another text are left out up front. The
+    rest are tried in registration order as usual, so a handler registered
+    earlier (a state handler taking any text, say) still comes first.
+
+    The matching itself stays aiogram's: each text gets a plain observer of
+    the same router and event holding just its candidates, and the message
+    is triggered on that one. The middlewares resolve through the router, so
+    they are the same as on this observer.
+    """
+
+    def __init__(self, router: Router, event_name: str):
+        super().__init__(router=router, event_name=event_name)
+        self._by_text: Optional[Dict[str, TelegramEventObserver]] = None
+        self._without_text: Optional[TelegramEventObserver] = None
+
+    def register(self, *args: Any, **kwargs: Any):
+        self._by_text = None
+        return super().register(*args, **kwargs)
+
+    def _narrowed(self, handlers: List[HandlerObject]) -> TelegramEventObserver:
+        observer = TelegramEventObserver(router=self.router, event_name=self.event_name)
+        observer.handlers = handlers
+        return observer
+
+    def _index(self) -> Dict[str, TelegramEventObserver]:
+        texts = [_menu_text(handler) for handler in self.handlers]
+        self._without_text = self._narrowed([handler for handler, text in zip(self.handlers, texts) if text is None])
+        self._by_text = {
+            key: self._narrowed([handler for handler, text in zip(self.handlers, texts) if text is None or text == key])
+            for key in set(texts) if key is not None
+        }
+        return self._by_text
+
+    def _observer_for(self, event: TelegramObject) -> TelegramEventObserver:
+        by_text = self._by_text if self._by_text is not None else self._index()
+        text = getattr(event, "text", None)
+        if text is None:
+            return self._without_text
+        return by_text.get(text, self._without_text)
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        return await self._observer_for(event).trigger(event, **kwargs)
+
+class MenuRouter(Router):
+    """Router whose message handlers are indexed on their MenuText"""
+
+    def __init__(self, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        self.message = MenuObserver(router=self, event_name="message")
+        self.observers["message"] = self.message
@@ -1,14 +1,34 @@
+import asyncio
+import logging
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware, Bot
 from aiogram.types import Message, TelegramObject, CallbackQuery
 from app.domain.enums import UserStatus
-from app.infrastructure.repositories.sqlalchemy import SQLAlchemyChannelRepository
+from app.infrastructure.repositories.sqlalchemy import SQLAlchemyChannelRepository, SQLAlchemyChannelMembershipRepository
 from app.infrastructure.telegram.checker import TelegramChannelChecker
+from app.infrastructure.cache.membership import membership_cache
+from app.infrastructure.cache.subscription import subscription_gate
+from app.infrastructure.database.db_helper import session_factory
 from app.use_cases.subscription import SubscriptionService
 from app.presentation.keyboards.registration import check_subscription_kb
 from app.config.settings import settings
+from app.presentation.flags import SUBSCRIPTION, requires
+
+logger = logging.getLogger(__name__)
 
 class CheckStatusMiddleware(BaseMiddleware):
+    """
+    Lets only users subscribed to every required channel through.
+
+    With SUBSCRIPTION_STALE_SECONDS set, a user who passed the check within
+    MEMBERSHIP_POSITIVE_TTL goes straight to the handler. Past that, for the
+    stale window, they still do, while the check runs again in the background;
+    if it finds a channel left, the next update is gated.
+    """
+
+    def __init__(self):
+        self._revalidating: Dict[int, asyncio.Task] = {}
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -29,6 +49,9 @@ class CheckStatusMiddleware(BaseMiddleware):
             
         if db_user.status == UserStatus.BLOCKED:
             return
+
+        if not requires(data, SUBSCRIPTION):
+            return await handler(event, data)
             
         # Check for exemption: /start command or check_subscription callback
         is_start_cmd = isinstance(event, Message) and event.text and event.text.startswith("/start")
@@ -37,12 +60,23 @@ class CheckStatusMiddleware(BaseMiddleware):
         if is_start_cmd or is_check_cb:
             return await handler(event, data)
 
+        stale_mode = settings.SUBSCRIPTION_STALE_SECONDS > 0
+        if stale_mode:
+            age = subscription_gate.age(db_user.telegram_id)
+            if age is not None:
+                if age >= settings.MEMBERSHIP_POSITIVE_TTL:
+                    self._revalidate(bot, db_user.telegram_id)
+                return await handler(event, data)
+
         # For all other cases, enforce channel subscription
         channel_repo = SQLAlchemyChannelRepository(session)
         checker = TelegramChannelChecker(bot)
-        sub_service = SubscriptionService(channel_repo, checker)
+        sub_service = SubscriptionService(channel_repo, checker, SQLAlchemyChannelMembershipRepository(session))
         
         is_subbed, unsubscribed = await sub_service.check_user_subscription(db_user.telegram_id)
+        await session.release()
+        if is_subbed and stale_mode:
+            subscription_gate.confirm(db_user.telegram_id)
         
         if not is_subbed:
             text = (
@@ -58,3 +92,36 @@ class CheckStatusMiddleware(BaseMiddleware):
             return
 
         return await handler(event, data)
+
+    def _revalidate(self, bot: Bot, user_id: int):
+        """Rechecks a stale confirmation off the update's path, once at a time per user"""
+        if user_id in self._revalidating:
+            return
+        task = asyncio.create_task(self._recheck(bot, user_id))
+        self._revalidating[user_id] = task
+        task.add_done_callback(lambda _: self._revalidating.pop(user_id, None))
+
+    async def _recheck(self, bot: Bot, user_id: int):
+        subscription_gate.revalidations += 1
+        # Past the stored and cached answers, those are what is being revalidated
+        membership_cache.invalidate_user(user_id)
+        try:
+            # The update's session is closed by now, the recheck needs its own
+            async with session_factory() as session:
+                sub_service = SubscriptionService(
+                    SQLAlchemyChannelRepository(session),
+                    TelegramChannelChecker(bot),
+                    SQLAlchemyChannelMembershipRepository(session)
+                )
+                is_subbed, _ = await sub_service.check_user_subscription(user_id, stop_on_first=True, recheck=True)
+        except Exception as e:
+            # The stale confirmation stays until it runs out
+            logger.error(f"Background subscription recheck failed: user={user_id}, error={e}")
+            return
+
+        if is_subbed:
+            subscription_gate.confirm(user_id)
+        else:
+            subscription_gate.invalidate(user_id)
+            subscription_gate.revoked += 1
+            logger.info(f"User {user_id} left a required channel, gating the next update")
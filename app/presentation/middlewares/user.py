@@ -1,13 +1,20 @@
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
-from aiogram.types import Message, CallbackQuery, TelegramObject
+from aiogram.types import Message, CallbackQuery, TelegramObject, ChatMemberUpdated
 
 from app.domain.repositories import AbstractUserRepository
-from app.infrastructure.database.db_helper import get_db_session, session_factory
+from app.infrastructure.database.db_helper import LazySession, session_factory
 from app.infrastructure.repositories.sqlalchemy import SQLAlchemyUserRepository, SQLAlchemyReferralRepository
 from app.use_cases.registration import RegistrationService
+from app.presentation.flags import DB_USER, SUBSCRIPTION, SESSION, requires
 
 class UserMiddleware(BaseMiddleware):
+    """
+    Provides `db_user`, `session`, `user_repo` and `referral_repo`. Registered
+    on each event observer rather than on updates, so the handler is already
+    resolved and its flags (app.presentation.flags) can opt out of the lookup.
+    """
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -19,16 +26,37 @@ class UserMiddleware(BaseMiddleware):
         if not user:
             return await handler(event, data)
 
-        async with session_factory() as session:
+        # The subscription gate reads db_user as well
+        needs_user = requires(data, DB_USER) or requires(data, SUBSCRIPTION)
+        if not needs_user and not requires(data, SESSION):
+            return await handler(event, data)
+
+        # Connects on the first query only: a cached db_user and a handler
+        # that needs no database cost no connection at all
+        session = LazySession(session_factory)
+        try:
             user_repo = SQLAlchemyUserRepository(session)
             referral_repo = SQLAlchemyReferralRepository(session)
             
-            # Fetch DB user
-            db_user = await user_repo.get_user(user.id)
+            if needs_user:
+                # Fetch DB user, a read-only snapshot that is usually served from memory
+                db_user = await user_repo.get_user_snapshot(user.id)
+                
+                # Any interaction proves the chat is reachable again. my_chat_member
+                # updates are left to their handler, a block must not clear the marker,
+                # and a chat_member update happened in a channel, not in the bot's chat.
+                is_member_update = isinstance(event, ChatMemberUpdated)
+                if db_user and db_user.unreachable_since and not is_member_update:
+                    await user_repo.clear_unreachable(user.id)
+                
+                # Don't hold the lookup's read transaction through the handler's API calls
+                await session.release()
+                data["db_user"] = db_user
             
             data["session"] = session
             data["user_repo"] = user_repo
             data["referral_repo"] = referral_repo
-            data["db_user"] = db_user
             
             return await handler(event, data)
+        finally:
+            await session.close()
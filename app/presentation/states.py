@@ -22,6 +22,14 @@ class ProfileSG(StatesGroup):
     edit_phone_2 = State()
 
 class AdminSG(StatesGroup):
+    wait_broadcast_segment = State()
+    wait_broadcast_when = State()
+    wait_broadcast_year = State()
+    wait_broadcast_month = State()
+    wait_broadcast_day = State()
+    wait_broadcast_hour = State()
+    wait_broadcast_minute = State()
+    wait_broadcast_spread = State()
     wait_broadcast = State()
     wait_webinar_year = State()
     wait_webinar_month = State()
@@ -5,6 +5,8 @@ import pandas as pd
 from datetime import datetime
 from sqlalchemy import text
 from app.infrastructure.database.db_helper import session_factory
+from app.infrastructure.cache.channels import active_channels_cache
+from app.infrastructure.cache.users import user_cache
 from app.infrastructure.database.models import User, Channel, Referral, PointHistory, Reward, UserReward, UserSurveyAnswer, WebinarSettings, Admin
 
 logger = logging.getLogger(__name__)
@@ -187,6 +189,9 @@ class BackupService:
                             raise e # Checkpoint: If any sheet fails, everything rolls back
                 
                 await session.commit()
+                # Channels and users were replaced behind the repositories' back
+                active_channels_cache.invalidate()
+                user_cache.clear()
                 # Re-enable foreign keys after successful commit
                 await session.execute(text("PRAGMA foreign_keys = ON"))
                 
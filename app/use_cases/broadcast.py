@@ -0,0 +1,582 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramRetryAfter, TelegramForbiddenError, TelegramNetworkError, TelegramServerError
+)
+
+from app.config.settings import settings
+from app.domain.enums import BroadcastKind, BroadcastStatus, DeliveryStatus
+from app.infrastructure.database.models import BroadcastJob, Channel
+from app.infrastructure.repositories.sqlalchemy import (
+    SQLAlchemyBroadcastRepository, SQLAlchemyUserRepository, SQLAlchemyChannelRepository,
+    SQLAlchemyChannelMembershipRepository
+)
+from app.infrastructure.telegram.checker import TelegramChannelChecker
+from app.infrastructure.telegram.rate_limiter import bulk_traffic
+from app.presentation.keyboards.registration import check_subscription_kb
+from app.use_cases.broadcast_executor import BroadcastExecutor
+from app.use_cases.broadcast_progress import BroadcastProgress, ProgressPanel
+from app.use_cases.broadcast_template import BroadcastTemplate, RecipientContexts
+from app.use_cases.subscription import SubscriptionService
+
+logger = logging.getLogger(__name__)
+
+
+class Delivery(NamedTuple):
+    recipient_id: int
+    user_id: int
+    attempt: int = 0
+
+
+class RetryQueue:
+    """
+    Recipients whose send failed transiently (429, network, 5xx), waiting to be
+    re-delivered after a capped exponential backoff.
+    """
+
+    def __init__(self, base_delay: float, max_delay: float, max_attempts: int):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._heap: List[Tuple[float, int, Delivery]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, delivery: Delivery) -> bool:
+        """Queue the next attempt. Returns False once the attempts are exhausted."""
+        attempt = delivery.attempt + 1
+        if attempt > self.max_attempts:
+            return False
+        delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), delivery._replace(attempt=attempt)))
+        return True
+
+    def pop_due(self) -> List[Delivery]:
+        due = []
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def next_due_in(self) -> Optional[float]:
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+
+class JobControl:
+    """Stop requests for a running job, honoured by its workers between sends"""
+
+    def __init__(self):
+        self.stop_status: Optional[BroadcastStatus] = None
+        # Wakes the producer when a send settles or a stop is requested
+        self.wakeup = asyncio.Event()
+
+    @property
+    def stopping(self) -> bool:
+        return self.stop_status is not None
+
+    def request_stop(self, status: BroadcastStatus):
+        self.stop_status = status
+        self.wakeup.set()
+
+
+class DeliveryRecorder:
+    """
+    Buffers per-recipient outcomes and writes them to the job in batches.
+    Users that blocked the bot are also marked unreachable, so later mass
+    sends skip them.
+    """
+
+    def __init__(self, session_factory, job_id: int, batch_size: int):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.batch_size = batch_size
+        self._pending: Dict[DeliveryStatus, List[int]] = {}
+        self._blocked_users: List[int] = []
+        self._size = 0
+        self._retried = 0
+        self._lock = asyncio.Lock()
+
+    async def record(self, delivery: Delivery, state: DeliveryStatus):
+        self._pending.setdefault(state, []).append(delivery.recipient_id)
+        if state == DeliveryStatus.BLOCKED:
+            self._blocked_users.append(delivery.user_id)
+        self._size += 1
+        if self._size >= self.batch_size:
+            await self.flush()
+
+    def record_retry(self):
+        self._retried += 1
+
+    async def flush(self):
+        """Writes the buffered outcomes. On failure they are kept for the next flush."""
+        async with self._lock:
+            by_state, self._pending, self._size = self._pending, {}, 0
+            retried, self._retried = self._retried, 0
+            blocked_users, self._blocked_users = self._blocked_users, []
+            if not by_state and not retried:
+                return
+
+            try:
+                await self._write(by_state, retried, blocked_users)
+            except BaseException:
+                for state, ids in by_state.items():
+                    self._pending.setdefault(state, []).extend(ids)
+                    self._size += len(ids)
+                self._retried += retried
+                self._blocked_users.extend(blocked_users)
+                raise
+
+    async def _write(self, by_state: Dict[DeliveryStatus, List[int]], retried: int, blocked_users: List[int]):
+        # One transaction: the counters never disagree with the recipient rows
+        async with self.session_factory() as session:
+            repo = SQLAlchemyBroadcastRepository(session)
+            for state, ids in by_state.items():
+                await repo.mark_recipients(ids, state, commit=False)
+            await repo.add_counters(
+                self.job_id,
+                sent=len(by_state.get(DeliveryStatus.SENT, [])),
+                blocked=len(by_state.get(DeliveryStatus.BLOCKED, [])),
+                failed=len(by_state.get(DeliveryStatus.FAILED, [])),
+                skipped=len(by_state.get(DeliveryStatus.SKIPPED, [])),
+                retried=retried,
+                commit=False
+            )
+            await SQLAlchemyUserRepository(session).mark_unreachable(blocked_users, commit=False)
+            await session.commit()
+
+
+class BroadcastService:
+    """
+    Runs broadcast jobs persisted in broadcast_jobs / broadcast_recipients.
+
+    Every recipient has its own delivery state, so a job interrupted by a crash
+    or redeploy is resumed from the first still-pending recipient instead of
+    being restarted (and double-sent) from scratch.
+    """
+
+    RECIPIENT_PAGE_SIZE = 1000
+
+    def __init__(self, session_factory, bot: Bot):
+        self.session_factory = session_factory
+        self.bot = bot
+        self.batch_size = settings.BROADCAST_BATCH_SIZE
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._progress: Dict[int, BroadcastProgress] = {}
+        self._controls: Dict[int, JobControl] = {}
+        self._closing = False
+
+    def get_progress(self, job_id: int) -> Optional[BroadcastProgress]:
+        """Live counters of a running job, None once it is not running"""
+        return self._progress.get(job_id)
+
+    def running_progress(self) -> List[BroadcastProgress]:
+        return list(self._progress.values())
+
+    async def create_job(self, label: str, filters: Optional[dict] = None, **payload) -> BroadcastJob:
+        """
+        Persist a job and its recipients. Recipients are streamed from the users
+        table page by page, so memory stays flat regardless of audience size.
+        Admins and users marked unreachable are never recipients.
+
+        The job stays CREATING, which nothing runs, until the last page is
+        written: a crash halfway leaves no job with part of its audience for
+        resume_unfinished() to send to.
+
+        Pass status=SCHEDULED with scheduled_at to have start_due_jobs() start
+        it later, and spread_seconds to send it evenly over that long. Pass
+        expires_at for messages that are pointless late: the job is cancelled
+        instead of started or resumed past it, and stops if it is still running.
+        """
+        status = payload.pop("status", BroadcastStatus.PENDING)
+        async with self.session_factory() as session:
+            repo = SQLAlchemyBroadcastRepository(session)
+            user_repo = SQLAlchemyUserRepository(session)
+            job = await repo.create_job(label, status=BroadcastStatus.CREATING, **payload)
+
+            async for user_ids in user_repo.iter_recipient_ids(self.RECIPIENT_PAGE_SIZE, self._audience(filters)):
+                await repo.add_recipients(job.id, user_ids)
+
+            await repo.set_status(job.id, status)
+            return await repo.get_job(job.id)
+
+    async def count_recipients(self, filters: Optional[dict] = None) -> int:
+        """How many users create_job() would target with these filters"""
+        async with self.session_factory() as session:
+            return await SQLAlchemyUserRepository(session).count_recipients(self._audience(filters))
+
+    @staticmethod
+    def _audience(filters: Optional[dict]) -> dict:
+        return {**(filters or {}), "exclude_ids": settings.ADMIN_IDS}
+
+    def start(self, job_id: int) -> asyncio.Task:
+        """Run a job in the background, keeping a reference to the task"""
+        task = self._tasks.get(job_id)
+        if task and not task.done():
+            return task
+
+        task = asyncio.create_task(self._run_job(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(functools.partial(self._job_done, job_id))
+        return task
+
+    def _job_done(self, job_id: int, task: asyncio.Task):
+        self._tasks.pop(job_id, None)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Broadcast job #{job_id} crashed", exc_info=task.exception())
+
+    async def start_due_jobs(self) -> List[int]:
+        """Start scheduled jobs whose time has come, including ones missed while the bot was down"""
+        async with self.session_factory() as session:
+            jobs = await SQLAlchemyBroadcastRepository(session).claim_due_jobs(datetime.now())
+
+        for job in jobs:
+            logger.info(f"Starting scheduled broadcast job #{job.id} ({job.label}), due at {job.scheduled_at}")
+            self.start(job.id)
+        return [job.id for job in jobs]
+
+    async def resume_unfinished(self) -> List[int]:
+        """Restart jobs that were pending or running when the process stopped"""
+        async with self.session_factory() as session:
+            repo = SQLAlchemyBroadcastRepository(session)
+            # Their recipients were still being written, the admin has to send again
+            for job in await repo.get_jobs_by_status([BroadcastStatus.CREATING]):
+                logger.warning(f"Cancelling broadcast job #{job.id} ({job.label}), interrupted while being created")
+                await repo.set_status(job.id, BroadcastStatus.CANCELLED)
+            jobs = []
+            for job in await repo.get_unfinished_jobs():
+                if self._expired(job):
+                    logger.warning(f"Cancelling broadcast job #{job.id} ({job.label}), expired at {job.expires_at}")
+                    await repo.set_status(job.id, BroadcastStatus.CANCELLED)
+                else:
+                    jobs.append(job)
+
+        for job in jobs:
+            logger.info(f"Resuming broadcast job #{job.id} ({job.label})")
+            self.start(job.id)
+        return [job.id for job in jobs]
+
+    @staticmethod
+    def _expired(job: BroadcastJob) -> bool:
+        return job.expires_at is not None and job.expires_at <= datetime.now()
+
+    def is_running(self, job_id: int) -> bool:
+        task = self._tasks.get(job_id)
+        return task is not None and not task.done()
+
+    async def pause(self, job_id: int) -> bool:
+        """
+        Stop a running job once the sends in flight are done. Its remaining
+        recipients stay pending until resume().
+        """
+        control = self._controls.get(job_id)
+        if not control:
+            return False
+        control.request_stop(BroadcastStatus.PAUSED)
+        return True
+
+    async def resume(self, job_id: int) -> bool:
+        if self.is_running(job_id):
+            return False
+        async with self.session_factory() as session:
+            job = await SQLAlchemyBroadcastRepository(session).get_job(job_id)
+        if not job or job.status != BroadcastStatus.PAUSED:
+            return False
+        self.start(job_id)
+        return True
+
+    async def cancel(self, job_id: int) -> bool:
+        """Stop a job for good, running, paused or not started yet"""
+        control = self._controls.get(job_id)
+        if control:
+            control.request_stop(BroadcastStatus.CANCELLED)
+            return True
+
+        async with self.session_factory() as session:
+            repo = SQLAlchemyBroadcastRepository(session)
+            job = await repo.get_job(job_id)
+            stoppable = (BroadcastStatus.SCHEDULED, BroadcastStatus.PENDING, BroadcastStatus.PAUSED)
+            if not job or job.status not in stoppable or self.is_running(job_id):
+                return False
+            await repo.set_status(job_id, BroadcastStatus.CANCELLED)
+        return True
+
+    async def shutdown(self, timeout: float = settings.BROADCAST_SHUTDOWN_TIMEOUT):
+        """
+        Stop running jobs like pause() does, but leave them RUNNING so they
+        resume on next start. Sends in flight are finished and recorded first,
+        so none is repeated on resume; jobs still busy after `timeout` seconds
+        are cancelled.
+        """
+        self._closing = True
+        for control in self._controls.values():
+            control.request_stop(BroadcastStatus.RUNNING)
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            logger.warning("Broadcast job did not stop in time, cancelling it")
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_job(self, job_id: int):
+        # The job has a task of its own (see start()), so this covers every request it makes
+        bulk_traffic.set(True)
+
+        async with self.session_factory() as session:
+            repo = SQLAlchemyBroadcastRepository(session)
+            job = await repo.get_job(job_id)
+            if not job or job.status in (BroadcastStatus.COMPLETED, BroadcastStatus.CANCELLED):
+                return
+            if self._expired(job):
+                logger.warning(f"Broadcast job #{job_id} ({job.label}) expired at {job.expires_at}, cancelling it")
+                await repo.set_status(job_id, BroadcastStatus.CANCELLED)
+                return
+            await repo.set_status(job_id, BroadcastStatus.RUNNING)
+
+            send = functools.partial(self._send, job)
+            contexts = None
+            if job.kind == BroadcastKind.SUBSCRIPTION:
+                # Channels are loaded once per run instead of once per recipient
+                checker = TelegramChannelChecker(self.bot)
+                channels = await SubscriptionService(SQLAlchemyChannelRepository(session), checker).get_required_channels()
+                send = functools.partial(self._send_subscription_notice, job, checker, channels)
+            elif job.kind == BroadcastKind.TEMPLATE:
+                template = BroadcastTemplate(job.text, escape=job.parse_mode == "HTML")
+                contexts = RecipientContexts(self.session_factory, template.fields)
+                await contexts.load_ranks()
+                send = functools.partial(self._send_template, job, template, contexts)
+
+        logger.info(f"Broadcast job #{job_id} ({job.label}) started for {job.total} recipients")
+
+        # Seeded from the stored counters, so a resumed job continues where it was
+        progress = BroadcastProgress(
+            job_id, job.label, job.total,
+            sent=job.sent_count, blocked=job.blocked_count, failed=job.failed_count,
+            skipped=job.skipped_count, retried=job.retry_count
+        )
+        self._progress[job_id] = progress
+        control = JobControl()
+        self._controls[job_id] = control
+        if self._closing:
+            # Started during or just before shutdown(): nothing is sent
+            control.request_stop(BroadcastStatus.RUNNING)
+        panel = None
+        if job.created_by:
+            panel = ProgressPanel(self.bot, job.created_by, progress, settings.BROADCAST_PROGRESS_INTERVAL)
+            await panel.start()
+
+        recorder = DeliveryRecorder(self.session_factory, job_id, self.batch_size)
+        retries = RetryQueue(
+            settings.BROADCAST_RETRY_BASE_DELAY,
+            settings.BROADCAST_RETRY_MAX_DELAY,
+            settings.BROADCAST_MAX_RETRIES
+        )
+        in_flight = 0
+        # A spread job gets one recipient per slot, so the sends fill the window evenly.
+        # The slots split what is left of the window among the recipients left, so a
+        # resumed job still ends when the admin chose; past the window it sends at full speed.
+        interval = 0.0
+        if job.spread_seconds:
+            remaining = job.total - (job.sent_count + job.blocked_count + job.failed_count + job.skipped_count)
+            window_end = (job.scheduled_at or job.created_at) + timedelta(seconds=job.spread_seconds)
+            window = (window_end - datetime.now()).total_seconds()
+            if remaining > 0 and window > 0:
+                interval = window / remaining
+        next_slot = time.monotonic()
+
+        async def pace():
+            nonlocal next_slot
+            while not control.stopping:
+                delay = next_slot - time.monotonic()
+                if delay <= 0:
+                    break
+                control.wakeup.clear()
+                try:
+                    await asyncio.wait_for(control.wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            next_slot = max(next_slot, time.monotonic()) + interval
+
+        async def work():
+            nonlocal in_flight
+            async for delivery in self._iter_pending(job_id, contexts.prefetch if contexts else None):
+                if interval:
+                    await pace()
+                if self._expired(job):
+                    control.request_stop(BroadcastStatus.CANCELLED)
+                if control.stopping:
+                    return
+                for retry in retries.pop_due():
+                    in_flight += 1
+                    yield retry
+                in_flight += 1
+                yield delivery
+            # Drain retries, including the ones scheduled by sends still in flight
+            while not control.stopping:
+                control.wakeup.clear()
+                for retry in retries.pop_due():
+                    in_flight += 1
+                    yield retry
+                if not retries and not in_flight:
+                    break
+                try:
+                    await asyncio.wait_for(control.wakeup.wait(), retries.next_due_in())
+                except asyncio.TimeoutError:
+                    pass
+
+        async def handle(delivery: Delivery) -> Optional[DeliveryStatus]:
+            # Items already queued when a stop was requested are left pending
+            if control.stopping:
+                return DeliveryStatus.PENDING
+            return await self._deliver(send, delivery.user_id)
+
+        async def on_result(delivery: Delivery, state: Optional[DeliveryStatus]):
+            nonlocal in_flight
+            if state == DeliveryStatus.PENDING:
+                pass
+            elif state is None and retries.schedule(delivery):
+                recorder.record_retry()
+                progress.record_retry()
+            else:
+                state = state or DeliveryStatus.FAILED
+                progress.record(state)
+                await recorder.record(delivery, state)
+            if contexts and state is not None:
+                contexts.discard(delivery.user_id)
+            in_flight -= 1
+            control.wakeup.set()
+
+        executor = BroadcastExecutor(
+            handler=handle,
+            workers=settings.BROADCAST_CONCURRENCY,
+            on_result=on_result
+        )
+        try:
+            await executor.run(work())
+            progress.status = control.stop_status or BroadcastStatus.COMPLETED
+        finally:
+            try:
+                # Also on cancellation, so a restart does not re-send what was delivered
+                await recorder.flush()
+            except Exception as e:
+                logger.error(f"Broadcast job #{job_id}: recording the last deliveries failed: {e}", exc_info=True)
+            finally:
+                self._progress.pop(job_id, None)
+                self._controls.pop(job_id, None)
+                if panel:
+                    await panel.stop()
+
+        async with self.session_factory() as session:
+            repo = SQLAlchemyBroadcastRepository(session)
+            await repo.set_status(job_id, progress.status)
+            job = await repo.get_job(job_id)
+
+        logger.info(
+            f"Broadcast job #{job_id} ({job.label}) {job.status}. "
+            f"Sent: {job.sent_count}, Blocked: {job.blocked_count}, Errors: {job.failed_count}, "
+            f"Skipped: {job.skipped_count}, Retries: {job.retry_count}"
+        )
+        if job.status == BroadcastStatus.COMPLETED:
+            await self._report(job)
+
+    async def _iter_pending(
+        self, job_id: int, prefetch: Optional[Callable[[List[int]], Awaitable[None]]] = None
+    ) -> AsyncIterator[Delivery]:
+        """Pending recipients of a job, read page by page. `prefetch` loads per-user data of each page."""
+        async with self.session_factory() as session:
+            repo = SQLAlchemyBroadcastRepository(session)
+            cursor = 0
+            while True:
+                page = await repo.get_pending_recipients(job_id, cursor, self.batch_size)
+                if not page:
+                    return
+                if prefetch:
+                    await prefetch([user_id for _, user_id in page])
+                for recipient_id, user_id in page:
+                    yield Delivery(recipient_id, user_id)
+                cursor = page[-1][0]
+
+    async def _send(self, job: BroadcastJob, user_id: int) -> bool:
+        if job.kind == BroadcastKind.COPY:
+            await self.bot.copy_message(chat_id=user_id, from_chat_id=job.from_chat_id, message_id=job.message_id)
+        elif job.kind == BroadcastKind.TEXT:
+            await self.bot.send_message(chat_id=user_id, text=job.text, parse_mode=job.parse_mode)
+        else:
+            raise ValueError(f"Unsupported broadcast kind: {job.kind}")
+        return True
+
+    async def _send_template(
+        self, job: BroadcastJob, template: BroadcastTemplate, contexts: RecipientContexts, user_id: int
+    ) -> bool:
+        values = contexts.get(user_id)
+        if values is None:
+            # The user was deleted after the job was created
+            return False
+        await self.bot.send_message(chat_id=user_id, text=template.render(values), parse_mode=job.parse_mode)
+        return True
+
+    async def _send_subscription_notice(
+        self, job: BroadcastJob, checker: TelegramChannelChecker, channels: List[Channel], user_id: int
+    ) -> bool:
+        """Send the notice with a keyboard of the user's missing channels, if there are any"""
+        # A session per recipient, the workers check concurrently
+        async with self.session_factory() as session:
+            subscription = SubscriptionService(
+                SQLAlchemyChannelRepository(session), checker, SQLAlchemyChannelMembershipRepository(session)
+            )
+            is_subbed, unsubscribed = await subscription.check_channels(user_id, channels)
+        if is_subbed:
+            return False
+        await self.bot.send_message(
+            chat_id=user_id, text=job.text, parse_mode=job.parse_mode,
+            reply_markup=check_subscription_kb(unsubscribed)
+        )
+        return True
+
+    async def _deliver(self, send: Callable[[int], Awaitable[bool]], user_id: int) -> Optional[DeliveryStatus]:
+        """Send to one recipient. None means a transient failure worth retrying."""
+        try:
+            if not await send(user_id):
+                return DeliveryStatus.SKIPPED
+            return DeliveryStatus.SENT
+        except TelegramForbiddenError:
+            return DeliveryStatus.BLOCKED
+        except (TelegramRetryAfter, TelegramNetworkError, TelegramServerError) as e:
+            # A 429 also pauses every sender in RateLimitMiddleware
+            logger.debug(f"Transient error for {user_id}, will retry: {e}")
+            return None
+        except Exception as e:
+            logger.debug(f"Failed to send to {user_id}: {e}")
+            return DeliveryStatus.FAILED
+
+    async def _report(self, job: BroadcastJob):
+        if not job.created_by:
+            return
+
+        try:
+            report = (
+                "✅ <b>Rassilka yakunlandi!</b>\n\n"
+                f"👤 Jami: {job.total}\n"
+                f"✅ Yuborildi: {job.sent_count}\n"
+                f"🚫 Bloklagan: {job.blocked_count}\n"
+                f"❌ Xatoliklar: {job.failed_count}\n"
+            )
+            if job.skipped_count:
+                report += f"⏭ O'tkazib yuborildi: {job.skipped_count}\n"
+            report += f"🔁 Qayta urinishlar: {job.retry_count}"
+            await self.bot.send_message(job.created_by, report, parse_mode="HTML")
+        except Exception as e:
+            logger.error(f"Failed to send broadcast report to admin {job.created_by}: {e}")
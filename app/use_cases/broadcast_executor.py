@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from typing import AsyncIterable, Awaitable, Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_STOP = object()
+
+
+class BroadcastExecutor(Generic[T, R]):
+    """
+    Fixed pool of worker tasks pulling items from a bounded queue.
+
+    Unlike gathering one coroutine per recipient, memory and scheduler load
+    stay O(workers): the producer blocks while the queue is full, so recipients
+    are only read from the source as fast as they are sent.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[T], Awaitable[R]],
+        workers: int,
+        on_result: Optional[Callable[[T, R], Awaitable[None]]] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.on_result = on_result
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or workers * 2)
+
+    async def run(self, items: AsyncIterable[T]) -> None:
+        """Process every item, returning once all of them are done"""
+        tasks = [asyncio.create_task(self._produce(items))]
+        tasks += [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        try:
+            # A failing worker or producer aborts the whole run
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _produce(self, items: AsyncIterable[T]):
+        async for item in items:
+            await self.queue.put(item)
+        for _ in range(self.workers):
+            await self.queue.put(_STOP)
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+            result = await self.handler(item)
+            if self.on_result:
+                await self.on_result(item, result)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Optional
+
+from aiogram import Bot
+
+from app.domain.enums import BroadcastStatus, DeliveryStatus
+from app.presentation.keyboards.admin_broadcast import broadcast_control_kb
+from app.utils.formatters import format_duration
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BroadcastProgress:
+    """
+    Live counters of a running broadcast job.
+
+    `rate` is measured over the last RATE_WINDOW seconds only, so it follows
+    the current throughput instead of averaging over the whole run.
+    """
+
+    RATE_WINDOW = 30.0
+
+    job_id: int
+    label: str
+    total: int
+    sent: int = 0
+    blocked: int = 0
+    failed: int = 0
+    skipped: int = 0
+    retried: int = 0
+    status: BroadcastStatus = BroadcastStatus.RUNNING
+    started_at: float = field(default_factory=time.monotonic)
+    _finished: Deque[float] = field(default_factory=deque, init=False, repr=False)
+
+    @property
+    def done(self) -> int:
+        return self.sent + self.blocked + self.failed + self.skipped
+
+    @property
+    def remaining(self) -> int:
+        return max(self.total - self.done, 0)
+
+    def record(self, state: DeliveryStatus):
+        if state == DeliveryStatus.SENT:
+            self.sent += 1
+        elif state == DeliveryStatus.BLOCKED:
+            self.blocked += 1
+        elif state == DeliveryStatus.SKIPPED:
+            self.skipped += 1
+        else:
+            self.failed += 1
+        self._finished.append(time.monotonic())
+
+    def record_retry(self):
+        self.retried += 1
+
+    @property
+    def rate(self) -> float:
+        """Finished deliveries per second"""
+        now = time.monotonic()
+        while self._finished and self._finished[0] < now - self.RATE_WINDOW:
+            self._finished.popleft()
+        elapsed = min(now - self.started_at, self.RATE_WINDOW)
+        if elapsed <= 0:
+            return 0.0
+        return len(self._finished) / elapsed
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds until the job is done at the current rate, None while unknown"""
+        rate = self.rate
+        if not rate:
+            return None
+        return self.remaining / rate
+
+
+class ProgressPanel:
+    """
+    A single message in the admin's chat, edited every `interval` seconds
+    with the progress of a job, with buttons to pause, resume or cancel it.
+    """
+
+    HEADERS = {
+        BroadcastStatus.RUNNING: "📤",
+        BroadcastStatus.PAUSED: "⏸",
+        BroadcastStatus.COMPLETED: "✅",
+        BroadcastStatus.CANCELLED: "❌",
+    }
+
+    def __init__(self, bot: Bot, chat_id: int, progress: BroadcastProgress, interval: float):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.progress = progress
+        self.interval = interval
+        self._message_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        try:
+            message = await self.bot.send_message(
+                self.chat_id, self.render(), parse_mode="HTML", reply_markup=self._markup()
+            )
+        except Exception as e:
+            logger.error(f"Failed to send progress panel to {self.chat_id}: {e}")
+            return
+        self._message_id = message.message_id
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Stop refreshing and show the final counters"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            await self._edit()
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._edit()
+
+    async def _edit(self):
+        try:
+            await self.bot.edit_message_text(
+                self.render(), chat_id=self.chat_id, message_id=self._message_id,
+                parse_mode="HTML", reply_markup=self._markup()
+            )
+        except Exception as e:
+            # Most often "message is not modified" when nothing was sent since the last edit
+            logger.debug(f"Failed to update progress panel of job #{self.progress.job_id}: {e}")
+
+    def _markup(self):
+        return broadcast_control_kb(self.progress.job_id, self.progress.status)
+
+    def render(self) -> str:
+        p = self.progress
+        percent = p.done * 100 // p.total if p.total else 100
+        eta = p.eta
+        text = (
+            f"{self.HEADERS[p.status]} <b>Rassilka #{p.job_id}</b> ({p.label})\n\n"
+            f"📊 Jarayon: {p.done}/{p.total} ({percent}%)\n"
+            f"✅ Yuborildi: {p.sent}\n"
+            f"🚫 Bloklagan: {p.blocked}\n"
+            f"❌ Xatoliklar: {p.failed}\n"
+        )
+        if p.skipped:
+            text += f"⏭ O'tkazib yuborildi: {p.skipped}\n"
+        text += f"🔁 Qayta urinishlar: {p.retried}"
+        if p.status == BroadcastStatus.RUNNING:
+            text += (
+                f"\n\n⚡ Tezlik: {p.rate:.1f} xabar/s\n"
+                f"⏳ Qolgan vaqt: {format_duration(eta) if eta is not None else '—'}"
+            )
+        return text
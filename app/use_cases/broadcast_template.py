@@ -0,0 +1,90 @@
+import html
+import string
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.infrastructure.repositories.sqlalchemy import SQLAlchemyUserRepository, SQLAlchemyReferralRepository
+
+# Placeholders a broadcast text can use, filled per recipient
+PLACEHOLDERS = ("full_name", "balance", "rank", "referrals")
+# {full_name} of a user with neither a full name nor a first name
+DEFAULT_NAME = "Aziz foydalanuvchi"
+
+
+class BroadcastTemplate:
+    """
+    Broadcast text with per-user placeholders, e.g. "{full_name}, sizda {balance} ball".
+    The text is parsed once, rendering a recipient only joins the parts.
+    """
+
+    def __init__(self, text: str, escape: bool = True):
+        self.text = text
+        self.escape = escape
+        self._parts: List[Tuple[str, Optional[str]]] = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(text):
+            if field is not None and (field not in PLACEHOLDERS or format_spec or conversion):
+                raise ValueError(f"Unsupported placeholder: {{{field}}}")
+            self._parts.append((literal, field))
+        self.fields: Set[str] = {field for _, field in self._parts if field}
+
+    @staticmethod
+    def has_placeholders(text: str) -> bool:
+        return any(f"{{{name}}}" in text for name in PLACEHOLDERS)
+
+    def render(self, values: Dict[str, object]) -> str:
+        chunks = []
+        for literal, field in self._parts:
+            chunks.append(literal)
+            if field:
+                value = str(values[field])
+                chunks.append(html.escape(value) if self.escape else value)
+        return "".join(chunks)
+
+
+class RecipientContexts:
+    """
+    Placeholder values of the recipients a job is about to send to, loaded in
+    bulk a page of the recipient cursor at a time instead of per recipient.
+    Only the placeholders the template uses are queried.
+    """
+
+    def __init__(self, session_factory, fields: Set[str]):
+        self.session_factory = session_factory
+        self.fields = fields
+        self._ranks: Dict[int, int] = {}
+        self._values: Dict[int, Dict[str, object]] = {}
+
+    async def load_ranks(self):
+        """Rank of every balance, once per run"""
+        if "rank" not in self.fields:
+            return
+        async with self.session_factory() as session:
+            self._ranks = await SQLAlchemyUserRepository(session).get_balance_ranks()
+
+    async def prefetch(self, user_ids: List[int]):
+        async with self.session_factory() as session:
+            users = await SQLAlchemyUserRepository(session).get_users_by_ids(user_ids)
+            referrals = {}
+            if "referrals" in self.fields:
+                referrals = await SQLAlchemyReferralRepository(session).get_referral_counts(user_ids)
+
+        for user in users:
+            self._values[user.telegram_id] = {
+                "full_name": user.full_name or user.first_name or DEFAULT_NAME,
+                "balance": user.balance,
+                "rank": self._rank(user.balance),
+                "referrals": referrals.get(user.telegram_id, 0),
+            }
+
+    def _rank(self, balance: int) -> int:
+        rank = self._ranks.get(balance)
+        if rank is not None:
+            return rank
+        # A balance reached after load_ranks() shares the rank of the next lower known one
+        lower = [rank for known, rank in self._ranks.items() if known < balance]
+        return min(lower) if lower else max(self._ranks.values(), default=0) + 1
+
+    def get(self, user_id: int) -> Optional[Dict[str, object]]:
+        return self._values.get(user_id)
+
+    def discard(self, user_id: int):
+        self._values.pop(user_id, None)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import Bot
+
+from app.domain.enums import UserStatus
+from app.infrastructure.cache.subscription import subscription_gate
+from app.infrastructure.repositories.sqlalchemy import (
+    SQLAlchemyUserRepository, SQLAlchemyChannelRepository, SQLAlchemyChannelMembershipRepository
+)
+from app.infrastructure.telegram.checker import TelegramChannelChecker
+from app.infrastructure.telegram.rate_limiter import bulk_traffic
+
+logger = logging.getLogger(__name__)
+
+
+class MembershipSweeper:
+    """
+    Walks active users a batch at a time and asks Telegram about their
+    membership in every required channel, so the membership table and cache
+    stay warm without users having to interact, and joins and leaves are
+    counted per channel.
+
+    The lookups run as bulk traffic: the shared rate limiter paces them and
+    serves lookups made for live updates first.
+    """
+
+    def __init__(self, session_factory, bot: Bot):
+        self.session_factory = session_factory
+        self.bot = bot
+        # Last telegram_id checked, the next batch starts after it
+        self._cursor: Optional[int] = None
+
+    async def sweep_batch(self, batch_size: int) -> int:
+        """Checks the next `batch_size` users, starting over once all were seen. Returns how many were checked."""
+        bulk_traffic.set(True)
+
+        async with self.session_factory() as session:
+            channels = await SQLAlchemyChannelRepository(session).get_all_active()
+            if not channels:
+                return 0
+
+            user_ids: List[int] = []
+            pages = SQLAlchemyUserRepository(session).iter_recipient_ids(
+                batch_size, {"status": UserStatus.ACTIVE}, after_id=self._cursor
+            )
+            async for page in pages:
+                user_ids = page
+                break
+            if not user_ids:
+                # End of the table, the next run starts a new pass
+                self._cursor = None
+                return 0
+
+            known = await SQLAlchemyChannelMembershipRepository(session).get_users_memberships(
+                user_ids, [ch.channel_id for ch in channels]
+            )
+
+        checker = TelegramChannelChecker(self.bot)
+        pairs = [(user_id, ch.channel_id) for user_id in user_ids for ch in channels]
+        results = await asyncio.gather(*(checker.refresh(user_id, channel_id) for user_id, channel_id in pairs))
+
+        # Every answer is written, unchanged ones too: the rows' updated_at is what
+        # keeps them within MEMBERSHIP_ROW_TTL, so the gate can keep reading them
+        checked: List[Tuple[str, int, bool]] = []
+        changed = 0
+        churn: Dict[str, List[int]] = {}  # channel_id -> [joined, left]
+        for (user_id, channel_id), is_member in zip(pairs, results):
+            if is_member is None:
+                # Failed lookup, keep what we knew
+                continue
+            if not is_member:
+                # Whatever the table said, a cached pass of the gate is wrong now
+                subscription_gate.invalidate(user_id)
+            checked.append((channel_id, user_id, is_member))
+            was_member = known.get((user_id, channel_id))
+            if was_member == is_member:
+                continue
+            changed += 1
+            if was_member is None:
+                # First time seen, not a change
+                continue
+            counters = churn.setdefault(channel_id, [0, 0])
+            if is_member:
+                counters[0] += 1
+            else:
+                counters[1] += 1
+
+        async with self.session_factory() as session:
+            repo = SQLAlchemyChannelMembershipRepository(session)
+            await repo.set_memberships(checked)
+            for channel_id, (joined, left) in churn.items():
+                await repo.record_churn(channel_id, joined=joined, left=left)
+
+        self._cursor = user_ids[-1]
+        logger.info(
+            f"Membership sweep: {len(user_ids)} users up to {self._cursor}, "
+            f"{changed} memberships changed, churn {churn or 'none'}"
+        )
+        return len(user_ids)
@@ -1,5 +1,5 @@
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
@@ -11,19 +11,20 @@ from app.utils.formatters import format_uzb_time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from aiogram import Bot
-from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError
+from app.domain.enums import BroadcastKind
+from app.use_cases.broadcast import BroadcastService
+from app.use_cases.membership_sweep import MembershipSweeper
 from app.config.settings import settings
-from app.infrastructure.repositories.sqlalchemy import SQLAlchemyUserRepository
 
 logger = logging.getLogger(__name__)
 
 class WebinarSchedulerService:
-    def __init__(self, session_factory, bot: Bot):
+    def __init__(self, session_factory, bot: Bot, broadcast_service: BroadcastService):
         self.session_factory = session_factory
         self.bot = bot
+        self.broadcast_service = broadcast_service
+        self.membership_sweeper = MembershipSweeper(session_factory, bot)
         self.scheduler = AsyncIOScheduler()
-        # Limit concurrent sends to avoid flood limits (20 msgs/sec is safer)
-        self.semaphore = asyncio.Semaphore(20)
         
     async def check_and_send_reminder(self):
         """Check if webinar is approaching and trigger reminders"""
@@ -69,26 +70,18 @@ class WebinarSchedulerService:
                 if target_reminder:
                     logger.info(f"Triggering {target_reminder['flag']} for webinar at {webinar.webinar_datetime}")
                     
-                    user_repo = SQLAlchemyUserRepository(session)
-                    users = await user_repo.get_all_users()
-                    
                     # Mark this specific reminder as sent IMMEDIATELY to prevent double triggering
                     setattr(webinar, target_reminder["flag"], True)
                     await session.commit()
                     
-                    # Run broadcast in background so it doesn't block the scheduler
-                    asyncio.create_task(self._run_broadcast(users, target_reminder, webinar))
+                    # Persist the broadcast as a job; it runs in background and survives restarts
+                    await self._run_broadcast(target_reminder, webinar)
                     
         except Exception as e:
             logger.error(f"Error in check_and_send_reminder: {e}", exc_info=True)
 
-    async def _run_broadcast(self, users: List[User], reminder: dict, webinar: WebinarSettings):
-        """Perform non-blocking broadcast with rate limiting"""
-        sent_count = 0
-        blocked_count = 0
-        error_count = 0
-        admin_ids = set(settings.ADMIN_IDS)
-        
+    async def _run_broadcast(self, reminder: dict, webinar: WebinarSettings):
+        """Create a reminder broadcast job and start it without blocking the scheduler"""
         webinar_time_str = format_uzb_time(webinar.webinar_datetime)
         message = (
             "🎁 <b>Siz yutishga tayyormisiz?</b>\n\n"
@@ -99,42 +92,34 @@ class WebinarSchedulerService:
             "Tayyor turing!"
         )
 
-        async def send_to_user(user: User):
-            nonlocal sent_count, blocked_count, error_count
-            if user.telegram_id in admin_ids:
-                return
+        job = await self.broadcast_service.create_job(
+            reminder["flag"],
+            kind=BroadcastKind.TEXT,
+            text=message,
+            parse_mode="HTML",
+            # Same cutoff as the start reminder: not sent once the webinar is 30 minutes in
+            expires_at=webinar.webinar_datetime + timedelta(minutes=30)
+        )
+        logger.info(f"Starting broadcast job #{job.id} for {reminder['flag']} to {job.total} users...")
+        self.broadcast_service.start(job.id)
 
-            async with self.semaphore:
-                try:
-                    await self.bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=message,
-                        parse_mode="HTML"
-                    )
-                    sent_count += 1
-                except TelegramForbiddenError:
-                    blocked_count += 1
-                except TelegramRetryAfter as e:
-                    logger.warning(f"Rate limited! Sleeping for {e.retry_after}s")
-                    await asyncio.sleep(e.retry_after)
-                    # Retry once
-                    try:
-                        await self.bot.send_message(chat_id=user.telegram_id, text=message, parse_mode="HTML")
-                        sent_count += 1
-                    except Exception:
-                        error_count += 1
-                except Exception as e:
-                    error_count += 1
-                    logger.debug(f"Failed to send to {user.telegram_id}: {e}")
+    async def check_scheduled_broadcasts(self):
+        """Start broadcasts admins scheduled for now or earlier"""
+        try:
+            await self.broadcast_service.start_due_jobs()
+        except Exception as e:
+            logger.error(f"Error in check_scheduled_broadcasts: {e}", exc_info=True)
 
-        logger.info(f"Starting broadcast tasks for {reminder['flag']} to {len(users)} users...")
-        tasks = [send_to_user(user) for user in users]
-        await asyncio.gather(*tasks)
-        
-        logger.info(
-            f"Finish {reminder['flag']} broadcast: "
-            f"Sent: {sent_count}, Blocked: {blocked_count}, Errors: {error_count}"
-        )
+    async def sweep_memberships(self):
+        """Recheck a batch of users' channel membership, only in the quiet hours"""
+        if not settings.MEMBERSHIP_SWEEP_BATCH:
+            return
+        if not settings.MEMBERSHIP_SWEEP_START_HOUR <= datetime.now().hour < settings.MEMBERSHIP_SWEEP_END_HOUR:
+            return
+        try:
+            await self.membership_sweeper.sweep_batch(settings.MEMBERSHIP_SWEEP_BATCH)
+        except Exception as e:
+            logger.error(f"Error in sweep_memberships: {e}", exc_info=True)
     
     def start(self):
         """Start the scheduler with 1-minute interval checks"""
@@ -147,6 +132,18 @@ class WebinarSchedulerService:
             id='webinar_reminder_check',
             replace_existing=True
         )
+        self.scheduler.add_job(
+            self.check_scheduled_broadcasts,
+            trigger=IntervalTrigger(minutes=1),
+            id='scheduled_broadcasts_check',
+            replace_existing=True
+        )
+        self.scheduler.add_job(
+            self.sweep_memberships,
+            trigger=IntervalTrigger(minutes=5),
+            id='membership_sweep',
+            replace_existing=True
+        )
         self.scheduler.start()
         logger.info("Webinar scheduler started (checking every 1 minute)")
     
@@ -1,26 +1,107 @@
-from typing import List, Tuple
-from app.domain.repositories import AbstractChannelRepository
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from app.config.settings import settings
+from app.domain.repositories import AbstractChannelRepository, AbstractChannelMembershipRepository
 from app.domain.interfaces import AbstractChannelChecker
-from app.infrastructure.database.models import Channel
+from app.infrastructure.cache.channels import ChannelSnapshot
 
 class SubscriptionService:
-    def __init__(self, channel_repo: AbstractChannelRepository, checker: AbstractChannelChecker):
+    def __init__(
+        self,
+        channel_repo: AbstractChannelRepository,
+        checker: AbstractChannelChecker,
+        membership_repo: Optional[AbstractChannelMembershipRepository] = None
+    ):
         self.channel_repo = channel_repo
         self.checker = checker
+        self.membership_repo = membership_repo
 
-    async def get_required_channels(self) -> List[Channel]:
+    async def get_required_channels(self) -> List[ChannelSnapshot]:
         return await self.channel_repo.get_all_active()
 
-    async def check_user_subscription(self, user_id: int) -> Tuple[bool, List[Channel]]:
+    async def check_user_subscription(
+        self, user_id: int, stop_on_first: bool = False, recheck: bool = False
+    ) -> Tuple[bool, List[ChannelSnapshot]]:
         """
         Returns (is_subscribed_to_all, list_of_unsubscribed_channels)
         """
         channels = await self.channel_repo.get_all_active()
-        unsubscribed = []
-        
-        for channel in channels:
-            is_member = await self.checker.is_member(user_id, channel.channel_id)
-            if not is_member:
-                unsubscribed.append(channel)
-        
+        return await self.check_channels(user_id, channels, stop_on_first, recheck)
+
+    async def check_channels(
+        self, user_id: int, channels: List[ChannelSnapshot], stop_on_first: bool = False, recheck: bool = False
+    ) -> Tuple[bool, List[ChannelSnapshot]]:
+        """
+        Same as check_user_subscription against an already loaded channel list,
+        for callers checking many users at once.
+
+        Memberships known from chat_member updates are read from the local table,
+        only the other channels are asked from Telegram, concurrently (the shared
+        rate limiter still paces the lookups). Rows older than MEMBERSHIP_ROW_TTL
+        count as unknown, a leave may have been missed. Confirmed memberships are
+        stored, so the next check is local. `recheck` skips the table and asks
+        Telegram about every channel, for when the user says they just joined or
+        a confirmation is being revalidated; its answers bypass the cache and
+        tell a failed lookup apart, so a confirmed leave is stored too.
+
+        With stop_on_first the checks still running are cancelled at the first
+        channel the user is missing, and only the channels found missing by then
+        are returned: for callers that need the outcome, not the full list for
+        a keyboard.
+        """
+        known = {}
+        if self.membership_repo and channels and not recheck:
+            known = await self.membership_repo.get_memberships(
+                user_id, [ch.channel_id for ch in channels], max_age=settings.MEMBERSHIP_ROW_TTL
+            )
+
+        missing = [ch for ch in channels if known.get(ch.channel_id) is False]
+        if missing and stop_on_first:
+            return False, missing
+
+        unknown = [ch for ch in channels if ch.channel_id not in known]
+        results = await self._check_remote(user_id, unknown, stop_on_first, fresh=recheck)
+        if self.membership_repo:
+            for channel in unknown:
+                is_member = results.get(channel.channel_id)
+                # A failed lookup is None from a recheck but False otherwise,
+                # so only a recheck can store a leave
+                if is_member or (recheck and is_member is False):
+                    await self.membership_repo.set_membership(channel.channel_id, user_id, is_member)
+
+        unsubscribed = [
+            ch for ch in channels
+            if known.get(ch.channel_id) is False
+            or (ch.channel_id in results and not results[ch.channel_id])
+        ]
         return len(unsubscribed) == 0, unsubscribed
+
+    async def _check_remote(
+        self, user_id: int, channels: List[ChannelSnapshot], stop_on_first: bool, fresh: bool = False
+    ) -> Dict[str, Optional[bool]]:
+        """
+        Membership per channel from Telegram. With stop_on_first, only the checks
+        done by the first miss. `fresh` asks past the cache, a failed lookup is None.
+        """
+        lookup = self.checker.refresh if fresh else self.checker.is_member
+        if not stop_on_first:
+            results = await asyncio.gather(*(lookup(user_id, ch.channel_id) for ch in channels))
+            return {channel.channel_id: is_member for channel, is_member in zip(channels, results)}
+
+        checks = {
+            asyncio.ensure_future(lookup(user_id, channel.channel_id)): channel
+            for channel in channels
+        }
+        results = {}
+        pending = set(checks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for check in done:
+                    results[checks[check].channel_id] = check.result()
+                if not all(results.values()):
+                    break
+            return results
+        finally:
+            for check in pending:
+                check.cancel()
@@ -22,3 +22,18 @@ def format_uzb_time(dt: datetime) -> str:
         period = "tungi"
         
     return f"{period} {time_str}"
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Formats a number of seconds as a short Uzbek duration, e.g. "1 soat 5 daqiqa".
+    """
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+
+    if hours:
+        return f"{hours} soat {minutes} daqiqa"
+    if minutes:
+        return f"{minutes} daqiqa {secs} soniya"
+    return f"{secs} soniya"
@@ -0,0 +1,216 @@
+"""
+Offline broadcast throughput benchmark.
+
+Runs the real send paths, the admin broadcast (_run_manual_broadcast) and the
+webinar reminder (WebinarSchedulerService._run_broadcast), against a fake
+Telegram session with simulated latency, 429 bursts and blocked chats. It
+reports msg/s, p99 send latency, peak RSS and the delivered share per run.
+
+Every run uses a fresh process and a throwaway SQLite database.
+
+    python -m benchmarks.broadcast_bench
+    python -m benchmarks.broadcast_bench --users 100000 --concurrency 10 20 50
+    python -m benchmarks.broadcast_bench --users 10000 --min-rate 300 --min-delivered 95
+
+By default both scenarios run for 10k and 100k users, the audience the
+engine is sized for. The 100k runs take about five minutes each at the default
+latency; pass --users 10000 for a quick check.
+
+The global rate limit defaults far above Telegram's real one, so the engine,
+not the limiter, is what gets measured. Pass --global-rate 25 to see
+production pacing.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("ADMIN_IDS", "[1]")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from aiogram import Bot
+from aiogram.types import Chat, Message
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config.settings import settings
+from app.domain.enums import BroadcastStatus, UserStatus
+from app.infrastructure.database.db_helper import Base
+from app.infrastructure.database.models import BroadcastJob, User, WebinarSettings
+from app.infrastructure.telegram.rate_limiter import RateLimitMiddleware
+from app.presentation.handlers.admin import _run_manual_broadcast
+from app.use_cases.broadcast import BroadcastService
+from app.use_cases.scheduler import WebinarSchedulerService
+from benchmarks.fake_telegram import BENCH_TOKEN, FakeTelegramSession, LatencyProbe
+
+SCENARIOS = ("manual", "reminder")
+FIRST_USER_ID = 10_000_000
+
+
+@dataclass
+class Result:
+    scenario: str
+    users: int
+    concurrency: int
+    sent: int
+    blocked: int
+    failed: int
+    retries: int
+    seconds: float
+    p50: float
+    p99: float
+    peak_rss_mb: float
+
+    @property
+    def rate(self) -> float:
+        return self.sent / self.seconds if self.seconds else 0.0
+
+    @property
+    def delivered(self) -> float:
+        return self.sent * 100 / self.users if self.users else 0.0
+
+
+async def make_database(path: str, users: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    async with session_factory() as session:
+        for start in range(0, users, 5000):
+            rows = [
+                {"telegram_id": FIRST_USER_ID + i, "first_name": f"User {i}", "status": UserStatus.ACTIVE, "balance": i % 500}
+                for i in range(start, min(start + 5000, users))
+            ]
+            await session.execute(insert(User), rows)
+        await session.commit()
+    return engine, session_factory
+
+
+async def run_scenario(scenario: str, users: int, concurrency: int, args) -> Result:
+    settings.BROADCAST_CONCURRENCY = concurrency
+    admin_id = settings.ADMIN_IDS[0] if settings.ADMIN_IDS else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, session_factory = await make_database(os.path.join(tmp, "bench.sqlite3"), users)
+
+        session = FakeTelegramSession(
+            latency=args.latency,
+            forbidden_rate=args.forbidden_rate,
+            flood_every=args.flood_every,
+            flood_duration=args.flood_duration,
+            retry_after=args.retry_after
+        )
+        bot = Bot(BENCH_TOKEN, session=session)
+        probe = LatencyProbe()
+        bot.session.middleware(probe)
+        bot.session.middleware(RateLimitMiddleware(
+            global_rate=args.global_rate,
+            per_chat_rate=settings.PER_CHAT_RATE_LIMIT,
+            per_chat_burst=settings.PER_CHAT_BURST,
+            lookup_rate=settings.LOOKUP_RATE_LIMIT
+        ))
+        service = BroadcastService(session_factory, bot)
+
+        started = time.perf_counter()
+        if scenario == "manual":
+            admin_message = Message(message_id=1, date=datetime.now(), chat=Chat(id=admin_id, type="private"), text="Bench")
+            job = await _run_manual_broadcast(service, admin_message, admin_id)
+            await service.start(job.id)
+        else:
+            scheduler = WebinarSchedulerService(session_factory, bot, service)
+            webinar = WebinarSettings(webinar_datetime=datetime.now() + timedelta(hours=1), webinar_link="https://example.com")
+            await scheduler._run_broadcast({"flag": "sent_1h"}, webinar)
+            # start() hands back the task of a job that is already running
+            async with session_factory() as db:
+                jobs = await db.execute(select(BroadcastJob.id).where(BroadcastJob.status != BroadcastStatus.COMPLETED))
+                for job_id in jobs.scalars().all():
+                    await service.start(job_id)
+        seconds = time.perf_counter() - started
+
+        async with session_factory() as db:
+            job = (await db.execute(select(BroadcastJob))).scalar_one()
+        await engine.dispose()
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else 0.0
+    return Result(
+        scenario, job.total, concurrency,
+        job.sent_count, job.blocked_count, job.failed_count, job.retry_count,
+        seconds, probe.percentile(0.5), probe.percentile(0.99), peak_rss
+    )
+
+
+def _run_in_process(scenario: str, users: int, concurrency: int, args) -> Result:
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.ERROR)
+    return asyncio.run(run_scenario(scenario, users, concurrency, args))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 100_000], help="Audience sizes to run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[settings.BROADCAST_CONCURRENCY], help="Worker counts to compare")
+    parser.add_argument("--scenario", choices=SCENARIOS, nargs="+", default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean API latency, seconds")
+    parser.add_argument("--forbidden-rate", type=float, default=0.05, help="Share of chats that blocked the bot")
+    parser.add_argument("--flood-every", type=float, default=10.0, help="Seconds between 429 bursts, 0 disables them")
+    parser.add_argument("--flood-duration", type=float, default=0.5, help="Length of a 429 burst, seconds")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after of the simulated 429s")
+    parser.add_argument("--global-rate", type=float, default=10_000.0, help="Global messages per second of the limiter")
+    parser.add_argument("--min-rate", type=float, help="Fail if any run is slower than this many msg/s")
+    parser.add_argument("--min-delivered", type=float, help="Fail if any run delivers less than this percentage")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    context = multiprocessing.get_context("spawn")
+
+    header = f"{'scenario':<9} {'users':>7} {'workers':>7} {'msg/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'deliv %':>8} {'retries':>7} {'rss MB':>7} {'time s':>7}"
+    print(header)
+    print("-" * len(header))
+
+    failed = False
+    for users in args.users:
+        for concurrency in args.concurrency:
+            for scenario in args.scenario:
+                # A fresh process per run, so peak RSS belongs to that run alone
+                with context.Pool(1) as pool:
+                    r = pool.apply(_run_in_process, (scenario, users, concurrency, args))
+                print(
+                    f"{r.scenario:<9} {r.users:>7} {r.concurrency:>7} {r.rate:>8.1f} {r.p50 * 1000:>8.1f} "
+                    f"{r.p99 * 1000:>8.1f} {r.delivered:>8.2f} {r.retries:>7} {r.peak_rss_mb:>7.1f} {r.seconds:>7.1f}",
+                    flush=True
+                )
+                if args.min_rate is not None and r.rate < args.min_rate:
+                    failed = True
+                if args.min_delivered is not None and r.delivered < args.min_delivered:
+                    failed = True
+
+    if failed:
+        print("\nRegression: a run is below --min-rate or --min-delivered")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Offline update dispatch benchmark.
+
+Feeds private messages through a Dispatcher wired like main.py (same
+middlewares, same routers in the same order) and reports the mean cost of an
+update per scenario. Telegram is the fake session with zero latency and the
+database a throwaway SQLite file, so what is left is routing, middlewares
+and handler bodies.
+
+    python -m benchmarks.dispatch_bench
+    python -m benchmarks.dispatch_bench --updates 20000 --scenario unmatched admin_button
+
+Scenarios, all from a subscribed regular user unless named admin_*:
+
+    unmatched      text no handler takes, walks every router
+    user_button    a static user menu button ("📞 Bog‘lanish")
+    profile        the profile button, a handler that reads the database
+    admin_button   an admin menu button pressed by a regular user
+    admin_menu     the same button pressed by an admin
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("ADMIN_IDS", "[1]")
+
+# The app's engine points at ./data, relative to the working directory:
+# run from a scratch directory so the real database is never touched
+WORKDIR = tempfile.mkdtemp(prefix="dispatch_bench_")
+os.makedirs(os.path.join(WORKDIR, "data"))
+os.chdir(WORKDIR)
+
+from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Chat, Message, Update, User as TelegramUser
+from sqlalchemy import insert
+
+from app.config.settings import settings
+from app.domain.enums import UserStatus
+from app.infrastructure.database.db_helper import Base, engine, session_factory
+from app.infrastructure.database.models import Channel, ChannelMembership, User
+from app.presentation.handlers import registration, user, admin, profile, membership
+from app.presentation.middlewares.chat_type import ChatTypeMiddleware
+from app.presentation.middlewares.error_handler import ErrorHandlingMiddleware
+from app.presentation.middlewares.status import CheckStatusMiddleware
+from app.presentation.middlewares.user import UserMiddleware
+from benchmarks.fake_telegram import BENCH_TOKEN, FakeTelegramSession
+
+USER_ID = 10_000_000
+SCENARIOS = {
+    "unmatched": (USER_ID, "salom"),
+    "user_button": (USER_ID, "📞 Bog‘lanish"),
+    "profile": (USER_ID, "👤 Profil"),
+    "admin_button": (USER_ID, "📢 Kanallarni boshqarish"),
+    "admin_menu": (None, "📢 Kanallarni boshqarish"),
+}
+
+
+async def make_database():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        await session.execute(insert(User), [
+            {"telegram_id": telegram_id, "first_name": "Bench", "status": UserStatus.ACTIVE, "phone_number": "+998900000000"}
+            for telegram_id in (USER_ID, settings.ADMIN_IDS[0])
+        ])
+        session.add(Channel(channel_id="-1001", name="Bench", link="https://t.me/bench"))
+        session.add(ChannelMembership(channel_id="-1001", user_id=USER_ID, is_member=True))
+        await session.commit()
+
+
+def make_dispatcher() -> Dispatcher:
+    """The middleware and router setup of main.py"""
+    dp = Dispatcher(storage=MemoryStorage())
+    dp.message.outer_middleware(ChatTypeMiddleware())
+    dp.callback_query.outer_middleware(ChatTypeMiddleware())
+    user_middleware = UserMiddleware()
+    for observer in (dp.message, dp.callback_query, dp.my_chat_member, dp.chat_member):
+        observer.middleware(user_middleware)
+    dp.message.middleware(ErrorHandlingMiddleware())
+    dp.message.middleware(CheckStatusMiddleware())
+    dp.callback_query.middleware(ErrorHandlingMiddleware())
+    dp.callback_query.middleware(CheckStatusMiddleware())
+    for router in (registration.router, user.router, profile.router, admin.router, admin.public_router, membership.router):
+        dp.include_router(router)
+    return dp
+
+
+def make_update(update_id: int, user_id: int, text: str) -> Update:
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        from_user=TelegramUser(id=user_id, is_bot=False, first_name="Bench"),
+        text=text
+    ))
+
+
+async def run(args) -> int:
+    await make_database()
+    bot = Bot(BENCH_TOKEN, session=FakeTelegramSession(latency=0.0))
+    dp = make_dispatcher()
+
+    header = f"{'scenario':<13} {'updates':>8} {'us/update':>10} {'updates/s':>10}"
+    print(header)
+    print("-" * len(header))
+    failed = False
+    for name in args.scenario:
+        user_id, text = SCENARIOS[name]
+        user_id = user_id or settings.ADMIN_IDS[0]
+        # Warm-up: caches filled, code paths imported
+        for i in range(args.warmup):
+            await dp.feed_update(bot, make_update(i, user_id, text))
+
+        started = time.perf_counter()
+        for i in range(args.updates):
+            await dp.feed_update(bot, make_update(i, user_id, text))
+        seconds = time.perf_counter() - started
+
+        per_update = seconds * 1_000_000 / args.updates
+        print(f"{name:<13} {args.updates:>8} {per_update:>10.1f} {args.updates / seconds:>10.0f}", flush=True)
+        if args.max_us is not None and per_update > args.max_us:
+            failed = True
+
+    await engine.dispose()
+    if failed:
+        print("\nRegression: a scenario is slower than --max-us")
+        return 1
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=5000, help="Updates fed per scenario")
+    parser.add_argument("--warmup", type=int, default=200, help="Updates fed before timing")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), nargs="+", default=list(SCENARIOS))
+    parser.add_argument("--max-us", type=float, help="Fail if any scenario costs more microseconds per update")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.ERROR)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import AsyncGenerator, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import TelegramMethod, Response, SendMessage, CopyMessage, GetMe, GetChatMember
+from aiogram.types import Chat, ChatMemberMember, Message, MessageId, User
+
+from app.infrastructure.telegram.rate_limiter import OUTBOUND_METHODS
+
+BENCH_TOKEN = "123456:benchmark"
+
+
+class FakeTelegramSession(BaseSession):
+    """
+    Offline stand-in for the Bot API.
+
+    - every request takes `latency` seconds on average (±50% jitter)
+    - a `forbidden_rate` share of chats has blocked the bot, always the same ones
+    - every `flood_every` seconds, sends get a 429 with `retry_after` for
+      `flood_duration` seconds
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        forbidden_rate: float = 0.0,
+        flood_every: float = 0.0,
+        flood_duration: float = 1.0,
+        retry_after: int = 1,
+        seed: int = 42
+    ):
+        super().__init__()
+        self.latency = latency
+        self.forbidden_rate = forbidden_rate
+        self.flood_every = flood_every
+        self.flood_duration = flood_duration
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.started_at = time.monotonic()
+        self.calls: Dict[str, int] = {}
+
+    def is_forbidden(self, chat_id: int) -> bool:
+        # Multiplicative hash, so the same chats stay blocked across retries
+        return (chat_id * 2654435761) % 10_000 < self.forbidden_rate * 10_000
+
+    def in_flood(self) -> bool:
+        if not self.flood_every:
+            return False
+        # Bursts close each period, so the run starts outside of one
+        elapsed = (time.monotonic() - self.started_at) % self.flood_every
+        return elapsed >= self.flood_every - self.flood_duration
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None):
+        name = type(method).__name__
+        self.calls[name] = self.calls.get(name, 0) + 1
+        await asyncio.sleep(self.latency * (0.5 + self.random.random()))
+
+        if isinstance(method, (SendMessage, CopyMessage)):
+            if self.in_flood():
+                raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=self.retry_after)
+            if self.is_forbidden(method.chat_id):
+                raise TelegramForbiddenError(method=method, message="Forbidden: bot was blocked by the user")
+            if isinstance(method, CopyMessage):
+                return MessageId(message_id=1)
+            return Message(
+                message_id=1, date=datetime.now(), chat=Chat(id=method.chat_id, type="private"), text=method.text
+            )
+        if isinstance(method, GetMe):
+            return User(id=1, is_bot=True, first_name="Bench", username="bench_bot")
+        if isinstance(method, GetChatMember):
+            return ChatMemberMember(user=User(id=method.user_id, is_bot=False, first_name="User"))
+        return True
+
+    async def stream_content(self, url: str, *args, **kwargs) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self):
+        pass
+
+
+class LatencyProbe(BaseRequestMiddleware):
+    """
+    Records how long each outbound message took end to end. Register it
+    before the rate limiter, so limiter waits and flood pauses are included.
+    """
+
+    def __init__(self):
+        self.samples: List[float] = []
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: TelegramMethod) -> Response:
+        if not isinstance(method, OUTBOUND_METHODS):
+            return await make_request(bot, method)
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            self.samples.append(time.perf_counter() - started)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
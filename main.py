@@ -18,9 +18,12 @@ from app.presentation.middlewares.chat_type import ChatTypeMiddleware
 from app.presentation.middlewares.user import UserMiddleware
 from app.presentation.middlewares.status import CheckStatusMiddleware
 from app.presentation.middlewares.error_handler import ErrorHandlingMiddleware
-from app.presentation.handlers import registration, user, admin, profile
+from app.infrastructure.telegram.rate_limiter import RateLimitMiddleware
+from app.infrastructure.telegram.single_flight import SingleFlightMiddleware
+from app.presentation.handlers import registration, user, admin, profile, membership
 from app.infrastructure.database.db_helper import engine, session_factory
 from app.use_cases.scheduler import WebinarSchedulerService
+from app.use_cases.broadcast import BroadcastService
 from app.infrastructure.repositories.sqlalchemy import SQLAlchemyUserRepository
 
 
@@ -103,7 +106,7 @@ async def on_startup(bot: Bot):
     status_file.write_text(f"RUNNING\nStarted: {datetime.now().isoformat()}\nBot: @{bot_info.username}")
 
 
-async def on_shutdown(bot: Bot, scheduler_service):
+async def on_shutdown(bot: Bot, scheduler_service, broadcast_service=None):
     """Actions to perform on bot shutdown"""
     logging.info("Bot shutting down...")
     
@@ -113,6 +116,11 @@ async def on_shutdown(bot: Bot, scheduler_service):
             scheduler_service.shutdown()
             logging.info("Scheduler stopped")
         
+        # Stop running broadcasts (they are resumed on next start)
+        if broadcast_service:
+            await broadcast_service.shutdown()
+            logging.info("Broadcast jobs suspended")
+        
         # Close bot session
         await bot.session.close()
         logging.info("Bot session closed")
@@ -138,25 +146,45 @@ async def main():
     
     bot = None
     scheduler_service = None
+    broadcast_service = None
     
     try:
         # Initialize Bot
         logger.info("Initializing bot...")
         bot = Bot(token=settings.BOT_TOKEN.get_secret_value())
         
+        # Identical lookups in flight at the same time share one request
+        single_flight = SingleFlightMiddleware()
+        bot.session.middleware(single_flight)
+        # Every outbound message of the process shares one flood budget
+        bot.session.middleware(RateLimitMiddleware(
+            global_rate=settings.GLOBAL_RATE_LIMIT,
+            per_chat_rate=settings.PER_CHAT_RATE_LIMIT,
+            per_chat_burst=settings.PER_CHAT_BURST,
+            lookup_rate=settings.LOOKUP_RATE_LIMIT
+        ))
+        
         # Initialize Storage
         storage = MemoryStorage()
         logger.info("Memory storage initialized")
 
         dp = Dispatcher(storage=storage)
 
+        # Broadcast engine, injected into handlers as `broadcast_service`
+        broadcast_service = BroadcastService(session_factory, bot)
+        dp["broadcast_service"] = broadcast_service
+        dp["single_flight"] = single_flight
+
         # Register Middlewares
         logger.info("Registering middlewares...")
         # ChatTypeMiddleware as outer middleware to filter group messages before any processing
         dp.message.outer_middleware(ChatTypeMiddleware())
         dp.callback_query.outer_middleware(ChatTypeMiddleware())
         
-        dp.update.middleware(UserMiddleware())
+        # Per event type, so UserMiddleware sees the handler's flags
+        user_middleware = UserMiddleware()
+        for observer in (dp.message, dp.callback_query, dp.my_chat_member, dp.chat_member):
+            observer.middleware(user_middleware)
         dp.message.middleware(ErrorHandlingMiddleware()) # Global error handler
         dp.message.middleware(CheckStatusMiddleware())
         dp.callback_query.middleware(ErrorHandlingMiddleware()) # Global error handler
@@ -168,15 +196,22 @@ async def main():
         dp.include_router(user.router)
         dp.include_router(profile.router)
         dp.include_router(admin.router)
+        dp.include_router(admin.public_router)
+        dp.include_router(membership.router)
 
         # Initialize and start webinar scheduler
         logger.info("Starting webinar scheduler...")
-        scheduler_service = WebinarSchedulerService(session_factory, bot)
+        scheduler_service = WebinarSchedulerService(session_factory, bot, broadcast_service)
         scheduler_service.start()
         
         # Startup actions
         await on_startup(bot)
         
+        # Continue broadcasts interrupted by a restart
+        resumed = await broadcast_service.resume_unfinished()
+        if resumed:
+            logger.info(f"Resumed broadcast jobs: {resumed}")
+        
         # Delete webhook and start polling
         logger.info("Deleting webhook...")
         await bot.delete_webhook(drop_pending_updates=True)
@@ -219,7 +254,7 @@ async def main():
         
     finally:
         logger.info("Executing cleanup...")
-        await on_shutdown(bot, scheduler_service)
+        await on_shutdown(bot, scheduler_service, broadcast_service)
         logger.info("="*60)
         logger.info("BOT APPLICATION STOPPED")
         logger.info("="*60)
@@ -0,0 +1,32 @@
+"""Add indexes for broadcast segments
+
+Revision ID: a5b6c7d8e9f0
+Revises: f4a5b6c7d8e9
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5b6c7d8e9f0'
+down_revision: Union[str, None] = 'f4a5b6c7d8e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_users_region'), 'users', ['region'], unique=False)
+    op.create_index(op.f('ix_users_status'), 'users', ['status'], unique=False)
+    op.create_index(op.f('ix_users_balance'), 'users', ['balance'], unique=False)
+    op.create_index(op.f('ix_webinar_checkins_user_id'), 'webinar_checkins', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_webinar_checkins_user_id'), table_name='webinar_checkins')
+    op.drop_index(op.f('ix_users_balance'), table_name='users')
+    op.drop_index(op.f('ix_users_status'), table_name='users')
+    op.drop_index(op.f('ix_users_region'), table_name='users')
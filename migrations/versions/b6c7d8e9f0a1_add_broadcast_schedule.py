@@ -0,0 +1,30 @@
+"""Add schedule columns to broadcast jobs
+
+Revision ID: b6c7d8e9f0a1
+Revises: a5b6c7d8e9f0
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6c7d8e9f0a1'
+down_revision: Union[str, None] = 'a5b6c7d8e9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('broadcast_jobs', sa.Column('scheduled_at', sa.DateTime(), nullable=True))
+    op.add_column('broadcast_jobs', sa.Column('spread_seconds', sa.Integer(), nullable=False, server_default='0'))
+    op.create_index(op.f('ix_broadcast_jobs_scheduled_at'), 'broadcast_jobs', ['scheduled_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_broadcast_jobs_scheduled_at'), table_name='broadcast_jobs')
+    op.drop_column('broadcast_jobs', 'spread_seconds')
+    op.drop_column('broadcast_jobs', 'scheduled_at')
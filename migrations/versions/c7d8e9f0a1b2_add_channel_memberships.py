@@ -0,0 +1,37 @@
+"""Add channel memberships table
+
+Revision ID: c7d8e9f0a1b2
+Revises: b6c7d8e9f0a1
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d8e9f0a1b2'
+down_revision: Union[str, None] = 'b6c7d8e9f0a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('channel_memberships',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('channel_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('is_member', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'channel_id')
+    )
+    op.create_index('ix_channel_memberships_channel_member', 'channel_memberships', ['channel_id', 'is_member'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_channel_memberships_channel_member', table_name='channel_memberships')
+    op.drop_table('channel_memberships')
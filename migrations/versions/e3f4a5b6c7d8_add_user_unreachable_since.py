@@ -0,0 +1,28 @@
+"""Add unreachable_since to users
+
+Revision ID: e3f4a5b6c7d8
+Revises: d2e3f4a5b6c7
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f4a5b6c7d8'
+down_revision: Union[str, None] = 'd2e3f4a5b6c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('unreachable_since', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_users_unreachable_since'), 'users', ['unreachable_since'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_unreachable_since'), table_name='users')
+    op.drop_column('users', 'unreachable_since')